@@ -0,0 +1,260 @@
+# Types
+from typing import Iterable
+
+# Libraries
+import os
+import sys
+import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from connect4.archive import EXTENSION, iter_records
+
+MAX_MOVES = 42
+OPENING_PLIES = 2
+
+
+class Summary:
+    """
+    Aggregated statistics of a set of match archives.
+
+    Only counters are kept, never the games themselves, so memory depends
+    on the number of players and distinct openings, not on the number of
+    games. Summaries of separate files are combined with ``merge``.
+
+    ``head_to_head`` maps each ``(player, rival)`` pair, names sorted, to
+    ``[player wins, rival wins, draws]``. ``first_results`` counts games won
+    by the player moving first, by the second one, and draws.
+    """
+
+    def __init__(self, opening_plies: int = OPENING_PLIES):
+        self.opening_plies = opening_plies
+        self.matches = 0
+        self.lengths = np.zeros(MAX_MOVES + 1, dtype=np.int64)
+        self.first_results = np.zeros(3, dtype=np.int64)
+        self.openings: Counter[str] = Counter()
+        self.head_to_head: dict[tuple[str, str], np.ndarray] = {}
+
+    @property
+    def games(self) -> int:
+        return int(self.lengths.sum())
+
+    def merge(self, other: "Summary") -> "Summary":
+        self.matches += other.matches
+        self.lengths += other.lengths
+        self.first_results += other.first_results
+        self.openings += other.openings
+        for pair, counts in other.head_to_head.items():
+            self._pair(*pair)[:] += counts
+        return self
+
+    def _pair(self, player: str, rival: str) -> np.ndarray:
+        return self.head_to_head.setdefault(
+            (player, rival), np.zeros(3, dtype=np.int64)
+        )
+
+    def add_match(
+        self,
+        player_a: str,
+        player_b: str,
+        moves: list[str],
+        winners: list[int],
+        a_first: list[bool | None],
+        result: dict | None = None,
+    ) -> None:
+        """
+        Count the games of one match.
+
+        Parameters
+        ----------
+        player_a, player_b : str
+            Names of the two players.
+        moves : list[str]
+            Moves of each game as a string of column digits.
+        winners : list[int]
+            Winner of each game: -1 for the first mover, 1 for the second, 0 for a draw.
+        a_first : list[bool | None]
+            Whether ``player_a`` moved first in each game, None if unknown.
+        result : dict, optional
+            Final score of the match, used when some first player is unknown.
+        """
+        self.matches += 1
+        if not moves:
+            return
+
+        lengths = np.fromiter((len(m) for m in moves), dtype=np.int64, count=len(moves))
+        winners = np.asarray(winners)
+        self.lengths += np.bincount(lengths, minlength=MAX_MOVES + 1)
+        self.first_results += np.bincount(
+            np.where(winners == 0, 2, (winners == 1).astype(int)), minlength=3
+        )
+        self.openings.update(m[: self.opening_plies] for m in moves)
+
+        if None in a_first and result is not None:
+            scores = (result["player_a_wins"], result["player_b_wins"], result["draws"])
+        else:
+            # Side that won each game, counted only where the first mover is known
+            known = np.array([f is not None for f in a_first])
+            first_is_a = np.array([bool(f) for f in a_first])
+            a_won = known & (winners != 0) & ((winners == -1) == first_is_a)
+            b_won = known & (winners != 0) & ~a_won
+            drawn = known & (winners == 0)
+            scores = (a_won.sum(), b_won.sum(), drawn.sum())
+
+        a_wins, b_wins, draws = (int(s) for s in scores)
+        if player_a <= player_b:
+            self._pair(player_a, player_b)[:] += (a_wins, b_wins, draws)
+        else:
+            self._pair(player_b, player_a)[:] += (b_wins, a_wins, draws)
+
+    def records(self) -> dict[str, np.ndarray]:
+        """``[wins, losses, draws]`` of every player over all its games."""
+        records: dict[str, np.ndarray] = {}
+        for (player, rival), (wins, losses, draws) in self.head_to_head.items():
+            records.setdefault(player, np.zeros(3, dtype=np.int64))[:] += (wins, losses, draws)
+            records.setdefault(rival, np.zeros(3, dtype=np.int64))[:] += (losses, wins, draws)
+        return records
+
+    def win_rates(self) -> dict[str, float]:
+        """Share of its games each player won, best first."""
+        rates = {
+            player: counts[0] / counts.sum() if counts.sum() else 0.0
+            for player, counts in self.records().items()
+        }
+        return dict(sorted(rates.items(), key=lambda item: -item[1]))
+
+    def first_player_advantage(self) -> float:
+        """Win rate of the first mover minus that of the second one."""
+        games = self.first_results.sum()
+        if not games:
+            return 0.0
+        return float((self.first_results[0] - self.first_results[1]) / games)
+
+    def length_distribution(self) -> np.ndarray:
+        """Fraction of games ending after each number of moves, 0 to 42."""
+        games = self.games
+        return self.lengths / games if games else self.lengths.astype(float)
+
+    def mean_length(self) -> float:
+        games = self.games
+        return float(self.lengths @ np.arange(MAX_MOVES + 1) / games) if games else 0.0
+
+    def top_openings(self, n: int = 10) -> list[tuple[str, int]]:
+        return self.openings.most_common(n)
+
+
+def summarize_file(path: str, opening_plies: int = OPENING_PLIES) -> Summary:
+    """Stream one archive, keeping only the columns needed for the counters."""
+    summary = Summary(opening_plies)
+    header: dict = {}
+    result = None
+    moves: list[str] = []
+    winners: list[int] = []
+    a_first: list[bool | None] = []
+
+    for record in iter_records(path):
+        if record["type"] == "match":
+            header = record
+        elif record["type"] == "game":
+            moves.append(record["moves"])
+            winners.append(record["winner"])
+            first = record.get("first")
+            a_first.append(None if first is None else first == header["player_a"])
+        elif record["type"] == "result":
+            result = record
+
+    if header:
+        summary.add_match(
+            header["player_a"], header["player_b"], moves, winners, a_first, result
+        )
+    return summary
+
+
+def archive_files(directory: str = "versus", recursive: bool = True) -> list[str]:
+    """Match archives in ``directory`` and, by default, its subdirectories such as ``league``."""
+    if not recursive:
+        return sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(EXTENSION)
+        )
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith(EXTENSION)
+    )
+
+
+def summarize(
+    paths: str | Iterable[str] = "versus",
+    workers: int = 1,
+    opening_plies: int = OPENING_PLIES,
+) -> Summary:
+    """
+    Aggregate match archives, reading up to ``workers`` files at a time.
+
+    Parameters
+    ----------
+    paths : str | Iterable[str], optional
+        Archive directory, searched recursively, or list of ``.jsonl`` files
+        (default is "versus").
+    workers : int, optional
+        Worker processes parsing files in parallel; 1 reads them serially
+        (default is 1).
+    opening_plies : int, optional
+        Number of first moves that identify an opening (default is 2).
+
+    Returns
+    -------
+    Summary
+        Counters of all the games found.
+    """
+    if isinstance(paths, str):
+        paths = archive_files(paths)
+    paths = list(paths)
+
+    total = Summary(opening_plies)
+    if workers <= 1:
+        for path in paths:
+            total.merge(summarize_file(path, opening_plies))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // (4 * workers))
+        summaries = pool.map(
+            summarize_file, paths, [opening_plies] * len(paths), chunksize=chunksize
+        )
+        for summary in summaries:
+            total.merge(summary)
+    return total
+
+
+def report(summary: Summary) -> str:
+    lines = [
+        f"Matches: {summary.matches}  Games: {summary.games}",
+        f"First-player advantage: {summary.first_player_advantage():+.3f}"
+        f"  (first {summary.first_results[0]}, second {summary.first_results[1]},"
+        f" draws {summary.first_results[2]})",
+        f"Mean game length: {summary.mean_length():.2f} moves",
+        "",
+        "Win rates:",
+    ]
+    records = summary.records()
+    for player, rate in summary.win_rates().items():
+        wins, losses, draws = records[player]
+        lines.append(f"  {player:<20} {rate:6.1%}  {wins}-{losses}-{draws}")
+    lines += ["", "Head to head:"]
+    for (player, rival), (wins, losses, draws) in sorted(summary.head_to_head.items()):
+        lines.append(f"  {player} vs {rival}: {wins}-{losses}-{draws}")
+    lines += ["", "Top openings:"]
+    for opening, count in summary.top_openings():
+        lines.append(f"  {opening or '-':<8} {count}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python -m connect4.analytics [versus] [workers]
+    directory = sys.argv[1] if len(sys.argv) > 1 else "versus"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    print(report(summarize(directory, workers)))
@@ -0,0 +1,172 @@
+# Types
+from typing import Any, Iterable, Iterator
+
+# Libraries
+import json
+import os
+import sys
+import numpy as np
+
+from connect4.connect_state import ConnectState
+from connect4.dtos import Game, Match
+
+VERSION = 1
+EXTENSION = ".jsonl"
+
+
+class MatchArchiveWriter:
+    """
+    Append-only match archive, one JSON object per line.
+
+    The first line describes the match (``"type": "match"``), then one
+    ``"game"`` line is appended as soon as each game ends and a closing
+    ``"result"`` line holds the final score. A game stores who moved first,
+    its moves as a string of column digits, the winner (-1 for the first
+    player, 1 for the second, 0 for a draw) and, under time control, the
+    mover's clock after each move and ``"forfeit": true`` when the game was
+    lost on time. Boards are rebuilt on demand by ``replay``.
+    """
+
+    def __init__(self, path: str, player_a: str, player_b: str, **metadata: Any):
+        self.path = path
+        self._file = open(path, "w")
+        self._append(
+            {
+                "type": "match",
+                "version": VERSION,
+                "player_a": player_a,
+                "player_b": player_b,
+                **metadata,
+            }
+        )
+
+    def __enter__(self) -> "MatchArchiveWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _append(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        # Finished games survive even if the match is interrupted
+        self._file.flush()
+
+    def write_game(
+        self,
+        first: str | None,
+        moves: Iterable[int],
+        winner: int,
+        clock: list[float] | None = None,
+        forfeit: bool = False,
+    ) -> None:
+        record = {
+            "type": "game",
+            "first": first,
+            "moves": "".join(str(m) for m in moves),
+            "winner": winner,
+        }
+        if clock:
+            record["clock"] = [round(t, 4) for t in clock]
+        if forfeit:
+            record["forfeit"] = True
+        self._append(record)
+
+    def write_result(self, player_a_wins: int, player_b_wins: int, draws: int) -> None:
+        self._append(
+            {
+                "type": "result",
+                "player_a_wins": player_a_wins,
+                "player_b_wins": player_b_wins,
+                "draws": draws,
+            }
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def iter_records(path: str) -> Iterator[dict[str, Any]]:
+    """Stream the records of an archive, one line at a time."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(moves: str | list[int]) -> Iterator[tuple[np.ndarray, int]]:
+    """
+    Rebuild the boards of a game lazily.
+
+    Yields
+    ------
+    tuple[np.ndarray, int]
+        The board before each move and the column played on it.
+    """
+    return iter(Game(moves))
+
+
+def final_state(moves: str | list[int]) -> ConnectState:
+    state = ConnectState()
+    for move in moves:
+        state = state.transition(int(move))
+    return state
+
+
+def read_match(path: str) -> Match:
+    """Load an archive as a ``Match``; boards are only built when games are iterated."""
+    header: dict[str, Any] = {}
+    result: dict[str, Any] = {}
+    games: list[Game] = []
+    clocks: list[list[float]] = []
+    for record in iter_records(path):
+        if record["type"] == "match":
+            header = record
+        elif record["type"] == "game":
+            games.append(Game(record["moves"]))
+            # One entry per game, empty when it had no clock
+            clocks.append(record.get("clock", []))
+        elif record["type"] == "result":
+            result = record
+    return Match(
+        player_a=header["player_a"],
+        player_b=header["player_b"],
+        player_a_wins=result.get("player_a_wins", 0),
+        player_b_wins=result.get("player_b_wins", 0),
+        draws=result.get("draws", 0),
+        games=games,
+        clocks=clocks,
+    )
+
+
+def convert_match_json(json_path: str, out_path: str) -> int:
+    """
+    Convert a ``versus/match_*.json`` file written by older versions of ``play``.
+
+    Those files do not say who moved first in each game, so ``first`` is
+    left empty; winners are recomputed by replaying the moves.
+
+    Returns
+    -------
+    int
+        Number of games converted.
+    """
+    with open(json_path, "r") as f:
+        match = json.load(f)
+
+    with MatchArchiveWriter(
+        out_path, match["player_a"], match["player_b"], source=os.path.basename(json_path)
+    ) as archive:
+        for game in match["games"]:
+            moves = [int(action) for _, action in game]
+            archive.write_game(None, moves, final_state(moves).get_winner())
+        archive.write_result(
+            match["player_a_wins"], match["player_b_wins"], match["draws"]
+        )
+    return len(match["games"])
+
+
+if __name__ == "__main__":
+    # python -m connect4.archive versus/*.json
+    for json_path in sys.argv[1:]:
+        out_path = os.path.splitext(json_path)[0] + EXTENSION
+        print(f"{json_path} -> {out_path}: {convert_match_json(json_path, out_path)} games")
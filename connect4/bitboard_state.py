@@ -0,0 +1,129 @@
+# Abstract
+from connect4.environment_state import EnvironmentState
+
+# Types
+from typing import Any
+
+# Libraries
+import numpy as np
+import matplotlib.pyplot as plt
+
+ROWS = 6
+COLS = 7
+H1 = ROWS + 1  # Bits per column, including the sentinel
+
+BOTTOM = sum(1 << (c * H1) for c in range(COLS))
+FULL = BOTTOM * ((1 << ROWS) - 1)
+COL_MASKS = tuple(((1 << ROWS) - 1) << (c * H1) for c in range(COLS))
+TOP_MASKS = tuple(1 << (ROWS - 1 + c * H1) for c in range(COLS))
+
+# Bit index of every cell of a top-down (ROWS, COLS) board
+SHIFTS = np.array(
+    [[c * H1 + (ROWS - 1 - r) for c in range(COLS)] for r in range(ROWS)],
+    dtype=np.uint64,
+)
+CELL_BITS = np.left_shift(np.uint64(1), SHIFTS)
+
+
+def has_alignment(bits: int) -> bool:
+    """Whether ``bits`` contains four aligned discs in any direction."""
+    # Vertical, horizontal and both diagonals
+    for shift in (1, H1, H1 - 1, H1 + 1):
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+class BitboardState(EnvironmentState):
+    """
+    Connect Four state stored as two bitboards.
+
+    Each column uses ``ROWS + 1`` bits (one sentinel bit on top), bit
+    ``col * (ROWS + 1) + row`` being the cell at ``row`` counted from the
+    bottom. ``position`` holds the discs of the player to move and ``mask``
+    every occupied cell. The public API mirrors ``ConnectState`` so both can
+    be used interchangeably by ``tournament.play`` and ``trainer``.
+    """
+
+    ROWS = ROWS
+    COLS = COLS
+
+    def __init__(self, board: np.ndarray | None = None, player: int = -1):
+        self.player = player  # -1 = Red, 1 = Yellow type: ignore
+        if board is None:
+            self.position = 0
+            self.mask = 0
+        else:
+            board = np.asarray(board)
+            self.position = int(CELL_BITS[board == player].sum())
+            self.mask = int(CELL_BITS[board != 0].sum())
+        self._board = None
+
+    @classmethod
+    def from_bits(cls, position: int, mask: int, player: int) -> "BitboardState":
+        state = cls.__new__(cls)
+        state.position = position
+        state.mask = mask
+        state.player = player
+        state._board = None
+        return state
+
+    @property
+    def board(self) -> np.ndarray:
+        # Materialized on first access only, search code never needs it
+        if self._board is None:
+            own = (np.uint64(self.position) >> SHIFTS) & np.uint64(1)
+            occupied = (np.uint64(self.mask) >> SHIFTS) & np.uint64(1)
+            self._board = np.where(
+                occupied == 1, np.where(own == 1, self.player, -self.player), 0
+            ).astype(int)
+        return self._board
+
+    def is_final(self) -> bool:
+        return self.mask == FULL or self.get_winner() != 0
+
+    def is_applicable(self, event: Any) -> bool:
+        return (
+            isinstance(event, int)
+            and 0 <= event < self.COLS
+            and self.is_col_free(event)
+            and not self.is_final()
+        )
+
+    def get_winner(self) -> int:
+        # The previous mover is the only one able to have just connected four
+        if has_alignment(self.position ^ self.mask):
+            return -self.player
+        if has_alignment(self.position):
+            return self.player
+        return 0
+
+    def is_col_free(self, col: int) -> bool:
+        return not self.mask & TOP_MASKS[col]
+
+    def get_heights(self) -> list[int]:
+        return [(self.mask & col_mask).bit_count() for col_mask in COL_MASKS]
+
+    def get_free_cols(self) -> list[int]:
+        return [c for c in range(self.COLS) if self.is_col_free(c)]
+
+    def get_hash(self) -> int:
+        """Unique 49-bit key of the position: ``position + mask``."""
+        return self.position + self.mask
+
+    def legal_moves(self) -> int:
+        """Bitmask of free columns, bit ``c`` set when column ``c`` accepts a disc."""
+        return sum(1 << c for c in range(COLS) if not self.mask & TOP_MASKS[c])
+
+    def transition(self, col: int) -> "BitboardState":
+        if not self.is_applicable(col):
+            raise ValueError(f"Move not allowed in column {col}.")
+
+        mask = self.mask | (self.mask + (1 << (col * H1)))
+        return BitboardState.from_bits(self.position ^ self.mask, mask, -self.player)
+
+    def show(self, size: int = 1500, ax: plt.Axes | None = None) -> None:
+        from connect4.connect_state import ConnectState
+
+        ConnectState(self.board, self.player).show(size=size, ax=ax)
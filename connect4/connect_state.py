@@ -8,6 +8,54 @@ from typing import Any
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Zobrist keys per (player, cell) plus one for Yellow to move, fixed seed so
+# hashes are stable across processes and runs
+_ZOBRIST_RNG = np.random.default_rng(0xC0E4)
+ZOBRIST = _ZOBRIST_RNG.integers(0, 2**64, size=(2, 6 * 7), dtype=np.uint64)
+ZOBRIST_KEYS = [[int(k) for k in keys] for keys in ZOBRIST]
+ZOBRIST_SIDE = int(_ZOBRIST_RNG.integers(0, 2**64, dtype=np.uint64))
+
+# Free columns for every legal-move mask, bit ``c`` set when column ``c`` is free
+FREE_COLS = tuple(
+    tuple(c for c in range(7) if mask >> c & 1) for mask in range(1 << 7)
+)
+
+
+class MoveAnalysis:
+    """
+    Result of ``ConnectState.analyze_moves``.
+
+    Attributes
+    ----------
+    children : dict[int, ConnectState]
+        State after each legal column, ready to be reused.
+    wins : tuple[int, ...]
+        Columns that win immediately for the player to move.
+    opponent_wins : tuple[int, ...]
+        Columns where the opponent would win if it moved now, the ones to block.
+    replies : dict[int, tuple[int, ...]]
+        For each legal column, the opponent's winning replies after it.
+    """
+
+    __slots__ = ("children", "wins", "opponent_wins", "replies")
+
+    def __init__(
+        self,
+        children: dict[int, "ConnectState"],
+        wins: tuple[int, ...],
+        opponent_wins: tuple[int, ...],
+        replies: dict[int, tuple[int, ...]],
+    ):
+        self.children = children
+        self.wins = wins
+        self.opponent_wins = opponent_wins
+        self.replies = replies
+
+    @property
+    def losing(self) -> tuple[int, ...]:
+        """Columns that hand the opponent an immediate win."""
+        return tuple(col for col, replies in self.replies.items() if replies)
+
 
 class ConnectState(EnvironmentState):
     ROWS = 6
@@ -19,9 +67,26 @@ class ConnectState(EnvironmentState):
         else:
             self.board = board.copy()
         self.player = player  # -1 = Red, 1 = Yellow type: ignore
+        # Discs per column and free-column bitmask, kept up to date by ``transition``
+        self._heights = [int(h) for h in np.count_nonzero(self.board, axis=0)]
+        self._legal = sum(
+            1 << c for c, h in enumerate(self._heights) if h < self.ROWS
+        )
+        # 64-bit Zobrist hash of the discs and the player to move
+        cells = self.board.ravel()
+        self._hash = int(np.bitwise_xor.reduce(ZOBRIST[0][cells == -1])) ^ int(
+            np.bitwise_xor.reduce(ZOBRIST[1][cells == 1])
+        )
+        if player == 1:
+            self._hash ^= ZOBRIST_SIDE
+        # Terminal status, filled in by ``transition`` or on first query
+        self._winner: int | None = None
+        self._final: bool | None = None
 
     def is_final(self) -> bool:
-        return self.get_winner() != 0 or not any(self.board[0] == 0)
+        if self._final is None:
+            self._final = self.get_winner() != 0 or not self._legal
+        return self._final
 
     def is_applicable(self, event: Any) -> bool:
         return (
@@ -32,6 +97,11 @@ class ConnectState(EnvironmentState):
         )
 
     def get_winner(self) -> int:
+        if self._winner is None:
+            self._winner = self._scan_winner()
+        return self._winner
+
+    def _scan_winner(self) -> int:
         # Check all 4 directions
         for r in range(self.ROWS):
             for c in range(self.COLS):
@@ -43,58 +113,134 @@ class ConnectState(EnvironmentState):
                 if c + 3 < self.COLS and all(
                     self.board[r, c + i] == player for i in range(4)
                 ):
-                    return player
+                    return int(player)
                 # Down
                 if r + 3 < self.ROWS and all(
                     self.board[r + i, c] == player for i in range(4)
                 ):
-                    return player
+                    return int(player)
                 # Diagonal right-down
                 if (
                     r + 3 < self.ROWS
                     and c + 3 < self.COLS
                     and all(self.board[r + i, c + i] == player for i in range(4))
                 ):
-                    return player
+                    return int(player)
                 # Diagonal left-down
                 if (
                     r + 3 < self.ROWS
                     and c - 3 >= 0
                     and all(self.board[r + i, c - i] == player for i in range(4))
                 ):
-                    return player
+                    return int(player)
 
         return 0
 
+    def _connects(self, row: int, col: int, player: int | None = None) -> bool:
+        """Whether the disc at (row, col), or one of ``player`` there, is part of four in a row."""
+        if player is None:
+            player = self.board[row, col]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                while (
+                    0 <= r < self.ROWS
+                    and 0 <= c < self.COLS
+                    and self.board[r, c] == player
+                ):
+                    count += 1
+                    r, c = r + sign * dr, c + sign * dc
+            if count >= 4:
+                return True
+        return False
+
     def is_col_free(self, col: int) -> bool:
-        return self.board[0, col] == 0
+        return bool(self._legal >> col & 1)
 
     def get_heights(self) -> list[int]:
-        heights = []
-        for c in range(self.COLS):
-            col = self.board[:, c]
-            for r in range(self.ROWS):
-                if col[r] != 0:
-                    heights.append(self.ROWS - r)
-                    break
-            else:
-                heights.append(0)
-        return heights
+        return self._heights[:]
 
     def get_free_cols(self) -> list[int]:
-        return [c for c in range(self.COLS) if self.is_col_free(c)]
+        return list(FREE_COLS[self._legal])
+
+    def get_hash(self) -> int:
+        """64-bit Zobrist hash of the position, updated incrementally by ``transition``."""
+        return self._hash
+
+    def legal_moves(self) -> int:
+        """Bitmask of free columns, bit ``c`` set when column ``c`` accepts a disc."""
+        return self._legal
 
     def transition(self, col: int) -> "ConnectState":
         if not self.is_applicable(col):
             raise ValueError(f"Move not allowed in column {col}.")
 
-        new_board = self.board.copy()
-        for r in reversed(range(self.ROWS)):
-            if new_board[r, col] == 0:
-                new_board[r, col] = self.player
-                break
+        child = ConnectState.__new__(ConnectState)
+        child.board = self.board.copy()
+        child.player = -self.player
+        child._heights = self._heights[:]
+        child._legal = self._legal
+
+        height = child._heights[col]
+        r = self.ROWS - 1 - height
+        child.board[r, col] = self.player
+        child._heights[col] = height + 1
+        child._hash = (
+            self._hash
+            ^ ZOBRIST_KEYS[(self.player + 1) // 2][r * self.COLS + col]
+            ^ ZOBRIST_SIDE
+        )
+        if height + 1 == self.ROWS:
+            child._legal &= ~(1 << col)
+
+        # Only lines through the new disc can have been completed
+        child._winner = self.player if child._connects(r, col) else 0
+        child._final = child._winner != 0 or not child._legal
+        return child
+
+    def analyze_moves(self) -> "MoveAnalysis":
+        """
+        Look one move ahead for both players in a single pass.
+
+        Each legal column is played once; immediate wins of the opponent are
+        found by testing its disc on the playable cells, so no extra states
+        are built for the replies.
+
+        Returns
+        -------
+        MoveAnalysis
+            Children, immediate wins of each side and the opponent's
+            winning replies to every move.
+        """
+        children: dict[int, ConnectState] = {}
+        wins: list[int] = []
+        opponent_wins: list[int] = []
+        if self.is_final():
+            return MoveAnalysis(children, (), (), {})
+
+        for col in FREE_COLS[self._legal]:
+            child = self.transition(col)
+            children[col] = child
+            if child._winner:
+                wins.append(col)
+            if self._connects(self.ROWS - 1 - self._heights[col], col, -self.player):
+                opponent_wins.append(col)
+
+        replies: dict[int, tuple[int, ...]] = {}
+        for col, child in children.items():
+            if child._final:
+                replies[col] = ()
+                continue
+            # Threats elsewhere are unchanged, the cell above the move is new
+            winning = [c for c in opponent_wins if c != col]
+            if child._legal >> col & 1 and child._connects(
+                self.ROWS - 1 - child._heights[col], col, -self.player
+            ):
+                winning.append(col)
+            replies[col] = tuple(sorted(winning))
 
-        return ConnectState(new_board, -self.player)
+        return MoveAnalysis(children, tuple(wins), tuple(opponent_wins), replies)
 
     def show(self, size: int = 1500, ax: plt.Axes | None = None) -> None:
         if ax is None:
@@ -1,4 +1,12 @@
-from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Iterable, Iterator, Literal
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    GetCoreSchemaHandler,
+    model_validator,
+)
+from pydantic_core import core_schema
 from connect4.policy import Policy
 import numpy as np
 
@@ -8,8 +16,94 @@ Participant = tuple[str, Policy]
 Versus = list[tuple[Participant | None, Participant | None]]
 
 
-class Game(list[tuple[State, Action]]):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+class Game:
+    """
+    History of one game stored as the sequence of columns played.
+
+    Boards are not kept: iterating a ``Game`` replays the moves and yields
+    the ``(board, action)`` pairs of the old list-based format, so memory
+    grows with the number of moves instead of the number of cells. In a
+    pydantic model a ``Game`` validates from another ``Game``, from
+    ``{"moves": "3344", "first": -1}`` or from the legacy list of
+    ``[board, action]`` pairs, and serializes back to that list. The first
+    player of legacy pairs is read from the disc on the second board; a
+    single pair holds no disc, so it is taken as Red.
+    """
+
+    __slots__ = ("moves", "first")
+
+    def __init__(self, moves: Iterable[int] | str = (), first: int = -1):
+        if isinstance(moves, str):
+            moves = (int(m) for m in moves)
+        self.moves = bytearray(moves)
+        self.first = first  # Player that makes the first move
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def __iter__(self) -> Iterator[tuple[State, Action]]:
+        return zip(self.boards(), self.moves)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Game):
+            return NotImplemented
+        return self.first == other.first and self.moves == other.moves
+
+    def __repr__(self) -> str:
+        return f"Game({str(self)!r}, first={self.first})"
+
+    def __str__(self) -> str:
+        return "".join(str(m) for m in self.moves)
+
+    def append(self, action: Action) -> None:
+        self.moves.append(action)
+
+    def boards(self) -> Iterator[State]:
+        """Yield the board before each move, built on demand."""
+        from connect4.connect_state import ConnectState
+
+        state = ConnectState(player=self.first)
+        for action in self.moves:
+            yield state.board
+            state = state.transition(action)
+
+    def to_pairs(self) -> list[tuple[list[list[int]], Action]]:
+        """Materialize the legacy ``[board, action]`` list."""
+        return [(board.tolist(), action) for board, action in self]
+
+    @classmethod
+    def validate(cls, value: Any) -> "Game":
+        if isinstance(value, Game):
+            return value
+        if isinstance(value, dict):
+            game = cls(value.get("moves", ()), value.get("first", -1))
+        elif isinstance(value, (list, tuple)):
+            # Legacy pairs: only the actions are read, boards are implied
+            # except the second one, whose only disc tells who moved first
+            first = -1
+            if len(value) > 1:
+                discs = np.asarray(value[1][0])
+                first = int(discs[discs != 0][0]) if discs.any() else -1
+            game = cls((int(action) for _, action in value), first)
+        else:
+            raise ValueError(f"Cannot build a Game from {type(value).__name__}.")
+
+        if max(game.moves, default=0) > 6 or any(
+            game.moves.count(c) > 6 for c in range(7)
+        ):
+            raise ValueError("Game moves must be columns 0-6 with at most 6 discs each.")
+        return game
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.to_pairs
+            ),
+        )
 
 
 class Match(BaseModel):
@@ -24,5 +118,61 @@ class Match(BaseModel):
 
     games: list[Game] = Field(
         default=[],
-        description="List of the history of each game, a state-action pair list produced by the alternating sequence of player actions.",
+        description="List of the history of each game, the alternating sequence of player actions; serialized as state-action pairs.",
     )
+    clocks: list[list[float]] = Field(
+        default=[],
+        description="Seconds left to the mover after each move of each game, an empty list for games played without time control.",
+    )
+
+
+class Standing(BaseModel):
+    name: str = Field(description="Participant name.")
+    rating: float = Field(description="Current rating.")
+    deviation: float | None = Field(
+        default=None, description="Rating uncertainty, None for systems without one."
+    )
+    wins: int = Field(default=0, description="Games won.")
+    losses: int = Field(default=0, description="Games lost.")
+    draws: int = Field(default=0, description="Games drawn.")
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.losses + self.draws
+
+
+class SearchResult(BaseModel):
+    move: int = Field(description="Best column found.")
+    score: float = Field(description="Score of the best move for the player to move.")
+    depth: int = Field(default=0, description="Deepest fully searched iteration.")
+    nodes: int = Field(default=0, description="Positions visited.")
+    elapsed: float = Field(default=0.0, description="Wall-clock seconds spent.")
+    nps: float = Field(default=0.0, description="Nodes per second.")
+
+
+class TimeControl(BaseModel):
+    move_time: float | None = Field(
+        default=None, description="Seconds allowed for each move, None for no limit."
+    )
+    initial: float | None = Field(
+        default=None,
+        description="Seconds on each player's clock at the start of a game, None for no clock.",
+    )
+    increment: float = Field(
+        default=0.0, description="Seconds added to the mover's clock after each move."
+    )
+    on_timeout: Literal["forfeit", "fallback"] = Field(
+        default="forfeit",
+        description="Lose the game on timeout, or play a fallback move instead.",
+    )
+
+    @model_validator(mode="after")
+    def check_limits(self) -> "TimeControl":
+        if self.move_time is None and self.initial is None:
+            raise ValueError("Time control needs a move_time, an initial clock or both.")
+        return self
+
+    def budget(self, remaining: float | None) -> float | None:
+        """Seconds available for the next move given the mover's clock."""
+        limits = [t for t in (self.move_time, remaining) if t is not None]
+        return min(limits) if limits else None
@@ -0,0 +1,141 @@
+# Libraries
+import numpy as np
+
+ROWS = 6
+COLS = 7
+CENTER_COLS = slice(2, 5)
+
+# Line directions, (row step, column step)
+HORIZONTAL = 0
+VERTICAL = 1
+DIAGONAL = 2
+ANTI_DIAGONAL = 3
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (-1, 1))
+
+
+def _build_lines() -> tuple[np.ndarray, np.ndarray]:
+    """Flat cell indices (row * COLS + col) of the 69 four-cell lines, by direction."""
+    lines = []
+    directions = []
+    for d, (dr, dc) in enumerate(DIRECTIONS):
+        for r in range(ROWS):
+            for c in range(COLS):
+                end_r, end_c = r + 3 * dr, c + 3 * dc
+                if 0 <= end_r < ROWS and 0 <= end_c < COLS:
+                    lines.append([(r + i * dr) * COLS + c + i * dc for i in range(4)])
+                    directions.append(d)
+    return np.array(lines, dtype=np.intp), np.array(directions, dtype=np.intp)
+
+
+LINES, LINE_DIRECTIONS = _build_lines()
+# First line of each direction, for np.add.reduceat
+_DIRECTION_STARTS = np.searchsorted(LINE_DIRECTIONS, np.arange(len(DIRECTIONS)))
+_NEIGHBORS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+
+class BoardFeatures:
+    """
+    Features of one board or a stack of boards, for both sides.
+
+    Side 0 is the player the features were extracted for, side 1 the
+    rival. With boards of shape ``(..., ROWS, COLS)``:
+
+    - ``windows[..., side, direction, n]``: open windows of that direction
+      holding ``n`` discs of ``side`` and ``4 - n`` empty cells (``n = 4``
+      is a connected four).
+    - ``center[..., side]``: discs of ``side`` in the three central columns.
+    - ``adjacency[..., side]``: over the discs of ``side``, the sum of their
+      neighbours of the same side in the eight directions.
+    """
+
+    __slots__ = ("windows", "center", "adjacency")
+
+    def __init__(self, windows: np.ndarray, center: np.ndarray, adjacency: np.ndarray):
+        self.windows = windows
+        self.center = center
+        self.adjacency = adjacency
+
+    def open(self, discs: int, directions: tuple[int, ...] | None = None) -> np.ndarray:
+        """``(..., 2)`` open windows with ``discs`` discs, optionally in some directions only."""
+        counts = self.windows[..., discs]
+        if directions is not None:
+            counts = counts[..., list(directions)]
+        return counts.sum(axis=-1)
+
+
+def _sides(boards: np.ndarray, player: int | np.ndarray) -> np.ndarray:
+    """``(..., 2, ROWS, COLS)`` masks of the player's and the rival's discs."""
+    player = np.asarray(player)[..., None, None]
+    return np.stack([boards == player, boards == -player], axis=-3)
+
+
+def neighbor_counts(boards: np.ndarray, player: int | np.ndarray) -> np.ndarray:
+    """``(..., ROWS, COLS)`` number of ``player`` discs around each cell."""
+    boards = np.asarray(boards)
+    own = boards == np.asarray(player)[..., None, None]
+    return _neighbor_counts(own)
+
+
+def _neighbor_counts(mask: np.ndarray) -> np.ndarray:
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad).astype(np.int64)
+    counts = np.zeros(mask.shape, dtype=np.int64)
+    for dr, dc in _NEIGHBORS:
+        counts += padded[..., 1 + dr : 1 + dr + ROWS, 1 + dc : 1 + dc + COLS]
+    return counts
+
+
+def winning_moves(boards: np.ndarray, player: int | np.ndarray) -> np.ndarray:
+    """
+    ``(..., COLS)`` mask of the columns where ``player`` would connect four.
+
+    Every column is tried at once by dropping the disc on a copy of each
+    board. Boards must not be finished already; full columns are False.
+    """
+    boards = np.asarray(boards)
+    player = np.asarray(player)[..., None]
+    heights = np.count_nonzero(boards, axis=-2)
+    free = heights < ROWS
+    rows = np.where(free, ROWS - 1 - heights, 0)
+
+    # (..., COLS, ROWS * COLS) children, one per column
+    children = np.repeat(boards.reshape(*boards.shape[:-2], 1, ROWS * COLS), COLS, axis=-2)
+    cells = rows * COLS + np.arange(COLS)
+    np.put_along_axis(
+        children, cells[..., None], np.where(free, player, 0)[..., None], axis=-1
+    )
+    line_sums = children[..., LINES].sum(axis=-1)  # (..., COLS, 69)
+    return (line_sums == 4 * player[..., None]).any(axis=-1) & free
+
+
+def extract(boards: np.ndarray, player: int | np.ndarray) -> BoardFeatures:
+    """
+    Compute every feature in one pass over the 69 lines.
+
+    Parameters
+    ----------
+    boards : np.ndarray
+        A ``(ROWS, COLS)`` board or a ``(..., ROWS, COLS)`` stack, e.g. the
+        children of a position.
+    player : int | np.ndarray
+        Side 0 of the features, one value for all boards or one per board.
+
+    Returns
+    -------
+    BoardFeatures
+        Window counts, center control and adjacency of both sides.
+    """
+    boards = np.asarray(boards)
+    sides = _sides(boards, player)
+
+    cells = sides.reshape(*sides.shape[:-2], ROWS * COLS)[..., LINES]
+    empty = (boards == 0).reshape(*boards.shape[:-2], 1, ROWS * COLS)[..., LINES]
+    discs = cells.sum(axis=-1)
+    is_open = (discs + empty.sum(axis=-1)) == 4
+    # (..., 2, 69, 5) one-hot disc count of every open window, summed by direction
+    one_hot = (discs[..., None] == np.arange(5)) & is_open[..., None]
+    windows = np.add.reduceat(one_hot.astype(np.int64), _DIRECTION_STARTS, axis=-2)
+
+    center = sides[..., CENTER_COLS].sum(axis=(-2, -1))
+    adjacency = (_neighbor_counts(sides) * sides).sum(axis=(-2, -1))
+    return BoardFeatures(windows, center, adjacency)
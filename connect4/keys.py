@@ -0,0 +1,91 @@
+# Libraries
+import numpy as np
+
+from connect4.bitboard_state import CELL_BITS, COLS, H1
+
+COLUMN_MASK = (1 << H1) - 1
+
+
+def player_to_move(board: np.ndarray) -> int:
+    """Player whose turn it is on ``board``: Red (-1) unless Red has one more disc."""
+    return -1 if np.count_nonzero(board == -1) == np.count_nonzero(board == 1) else 1
+
+
+def encode_board(board: np.ndarray, player: int) -> int:
+    """
+    Pack a board into a unique integer below 2**49.
+
+    The key is the ``position + mask`` sum of ``BitboardState``: discs of
+    ``player`` (the player to move) plus all occupied cells, which cannot
+    collide for boards reachable by legal play.
+
+    Parameters
+    ----------
+    board : np.ndarray
+        Top-down (ROWS, COLS) board with values -1, 0 and 1.
+    player : int
+        Player to move.
+
+    Returns
+    -------
+    int
+        Position key, fits in an unsigned 64-bit integer.
+    """
+    return int(CELL_BITS[board == player].sum()) + int(CELL_BITS[board != 0].sum())
+
+
+def mirror_key(key: int) -> int:
+    """Key of the left-right reflection of the board encoded by ``key``."""
+    # position + mask never carries across columns, so columns just swap places
+    mirrored = 0
+    for c in range(COLS):
+        mirrored |= ((key >> (c * H1)) & COLUMN_MASK) << ((COLS - 1 - c) * H1)
+    return mirrored
+
+
+def canonical_key(board: np.ndarray, player: int) -> tuple[int, bool]:
+    """
+    Key shared by a board and its mirror image.
+
+    Both reflections of a position have the same game value, so tables
+    indexed by this key store each pair once.
+
+    Returns
+    -------
+    tuple[int, bool]
+        The smaller of the two keys and whether it is the mirrored one, in
+        which case actions must go through ``canonical_action``.
+    """
+    key = encode_board(board, player)
+    mirrored = mirror_key(key)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+def canonical_keys(boards: np.ndarray, players: int | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ``canonical_key`` of a ``(..., ROWS, COLS)`` stack of boards at once.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        ``uint64`` canonical keys and a boolean mask of the mirrored ones.
+    """
+    boards = np.asarray(boards)
+    players = np.asarray(players)[..., None, None]
+
+    def encode(b: np.ndarray) -> np.ndarray:
+        own = np.where(b == players, CELL_BITS, np.uint64(0)).sum(axis=(-2, -1))
+        occupied = np.where(b != 0, CELL_BITS, np.uint64(0)).sum(axis=(-2, -1))
+        return own + occupied
+
+    keys = encode(boards)
+    mirrored = encode(boards[..., ::-1])
+    flip = mirrored < keys
+    return np.where(flip, mirrored, keys), flip
+
+
+def canonical_action(action: int, mirrored: bool) -> int:
+    """Map a column to or from the canonical orientation (its own inverse)."""
+    return COLS - 1 - action if mirrored else action
@@ -0,0 +1,383 @@
+# Types
+from typing import Callable
+
+# Libraries
+import math
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from connect4.bitboard_state import BOTTOM, CELL_BITS, COLS, FULL, H1, ROWS, BitboardState
+from connect4.dtos import SearchResult
+from connect4.environment_state import EnvironmentState
+from connect4.features import LINES
+from connect4.keys import player_to_move
+from connect4.policy import Policy
+from connect4.solver import COL_BITS, winning_cells
+
+UCT = "uct"
+PUCT = "puct"
+
+# Four-cell lines through each cell, indexed by bit like the bitboards
+_LINE_COUNTS = np.bincount(LINES.ravel(), minlength=ROWS * COLS)
+_CELL_WEIGHTS = {
+    int(bit): int(count) for bit, count in zip(CELL_BITS.ravel(), _LINE_COUNTS)
+}
+
+Prior = Callable[[int, int, list[int]], list[float]]
+
+
+def line_prior(position: int, mask: int, moves: list[int]) -> list[float]:
+    """Move probabilities proportional to the four-cell lines through the landing cell."""
+    weights = [_CELL_WEIGHTS[move] for move in moves]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def _columns(moves: int) -> list[int]:
+    return [moves & bits for bits in COL_BITS if moves & bits]
+
+
+def random_rollout(position: int, mask: int, rng: np.random.Generator) -> float:
+    """Play uniformly random moves to the end; result for the player to move."""
+    sign = 1.0
+    while True:
+        playable = (mask + BOTTOM) & FULL
+        if not playable:
+            return 0.0
+        moves = _columns(playable)
+        move = moves[rng.integers(len(moves))]
+        if move & winning_cells(position, mask):
+            return sign
+        position, mask = position ^ mask, mask | move
+        sign = -sign
+
+
+def heuristic_rollout(position: int, mask: int, rng: np.random.Generator) -> float:
+    """
+    Random playout that wins when it can, blocks a single threat and
+    avoids playing under a rival threat; result for the player to move.
+    """
+    sign = 1.0
+    while True:
+        playable = (mask + BOTTOM) & FULL
+        if not playable:
+            return 0.0
+        if playable & winning_cells(position, mask):
+            return sign
+        rival_wins = winning_cells(position ^ mask, mask)
+        forced = playable & rival_wins
+        if forced:
+            move = forced & -forced
+        else:
+            moves = _columns(playable & ~(rival_wins >> 1)) or _columns(playable)
+            move = moves[rng.integers(len(moves))]
+        position, mask = position ^ mask, mask | move
+        sign = -sign
+
+
+class Node:
+    """
+    Position of the search tree.
+
+    ``value`` sums the playout results from the point of view of the player
+    who moved into this node, so a parent picks the child with the best
+    mean for itself. ``terminal`` is that same player's result when the
+    move ended the game, None otherwise.
+    """
+
+    __slots__ = ("position", "mask", "col", "prior", "visits", "value", "terminal", "children")
+
+    def __init__(self, position: int, mask: int, col: int = -1, prior: float = 1.0):
+        self.position = position
+        self.mask = mask
+        self.col = col
+        self.prior = prior
+        self.visits = 0
+        self.value = 0.0
+        self.terminal: float | None = None
+        self.children: list[Node] | None = None
+
+    def expand(self, prior: Prior | None) -> None:
+        moves = _columns((self.mask + BOTTOM) & FULL)
+        priors = prior(self.position, self.mask, moves) if prior else [1.0] * len(moves)
+        wins = winning_cells(self.position, self.mask)
+        children = []
+        for move, p in zip(moves, priors):
+            child = Node(self.position ^ self.mask, self.mask | move, (move.bit_length() - 1) // H1, p)
+            if move & wins:
+                child.terminal = 1.0
+            elif child.mask == FULL:
+                child.terminal = 0.0
+            children.append(child)
+        self.children = children
+
+    def find(self, position: int, mask: int, plies: int = 2) -> "Node | None":
+        """Descendant at most ``plies`` moves below holding the given position."""
+        if self.position == position and self.mask == mask:
+            return self
+        if plies == 0 or not self.children:
+            return None
+        for child in self.children:
+            if (child.mask & mask) == child.mask:  # only nodes on the way to ``mask``
+                found = child.find(position, mask, plies - 1)
+                if found is not None:
+                    return found
+        return None
+
+
+class MCTS:
+    """
+    Monte Carlo tree search over bitboard positions.
+
+    Each iteration descends the tree with UCT (``exploration * sqrt(ln N / n)``)
+    or PUCT (``exploration * prior * sqrt(N) / (1 + n)``), expands the
+    leaf with all its moves, runs one playout from it and backs the result
+    up. The tree survives between calls: ``search`` looks for the observed
+    position among the nodes up to two plies below the previous root and
+    keeps searching from there, so the visits spent on the expected reply
+    are not lost.
+
+    With ``workers > 1`` the budget is also spent by independent searches
+    in worker processes (root parallelism); their root visit counts are
+    added to the local tree's before choosing the most visited move.
+    """
+
+    def __init__(
+        self,
+        iterations: int | None = 2000,
+        time_limit: float | None = None,
+        selection: str = UCT,
+        exploration: float | None = None,
+        prior: Prior | None = None,
+        rollout: Callable[[int, int, np.random.Generator], float] = heuristic_rollout,
+        reuse: bool = True,
+        workers: int = 1,
+        seed: int | None = None,
+    ):
+        if selection not in (UCT, PUCT):
+            raise ValueError(f"Unknown selection rule {selection!r}.")
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.selection = selection
+        if exploration is None:
+            exploration = math.sqrt(2) if selection == UCT else 1.5
+        self.exploration = exploration
+        if prior is None and selection == PUCT:
+            prior = line_prior
+        self.prior = prior
+        self.rollout = rollout
+        self.reuse = reuse
+        self.workers = workers
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.root: Node | None = None
+        self.reused = 0  # visits inherited by the last search
+        self._pool: ProcessPoolExecutor | None = None
+
+    def reset(self) -> None:
+        """Forget the tree, e.g. before a new game."""
+        self.root = None
+        self.reused = 0
+
+    def close(self) -> None:
+        """Shut down the worker processes of root parallelism, if any."""
+        if getattr(self, "_pool", None) is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __del__(self) -> None:
+        self.close()
+
+    def search(
+        self,
+        state: EnvironmentState,
+        iterations: int | None = None,
+        time_limit: float | None = None,
+    ) -> SearchResult:
+        """
+        Search from ``state`` within the iteration and time budget.
+
+        Parameters
+        ----------
+        state : EnvironmentState
+            Non-final ``BitboardState`` or ``ConnectState``.
+        iterations : int, optional
+            Playouts to run, the engine's by default.
+        time_limit : float, optional
+            Seconds to search, the engine's by default.
+
+        Returns
+        -------
+        SearchResult
+            Most visited column, its mean result in ``[-1, 1]`` for the
+            player to move, the depth of the tree and the playouts run.
+        """
+        if not isinstance(state, BitboardState):
+            state = BitboardState(state.board, state.player)
+        if state.is_final():
+            raise ValueError("Cannot search a final state.")
+        iterations = self.iterations if iterations is None else iterations
+        time_limit = self.time_limit if time_limit is None else time_limit
+        if iterations is None and time_limit is None:
+            raise ValueError("MCTS needs an iteration or time budget.")
+
+        start = time.perf_counter()
+        root = self._root(state.position, state.mask)
+
+        futures = []
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers - 1)
+            seeds = self.rng.integers(2**63, size=self.workers - 1)
+            futures = [
+                self._pool.submit(
+                    _search_root, state.position, state.mask, iterations, time_limit,
+                    self._config(), int(seed),
+                )
+                for seed in seeds
+            ]
+
+        depth = self._run(root, iterations, time_limit, start)
+
+        visits = {child.col: child.visits for child in root.children}
+        values = {child.col: child.value for child in root.children}
+        playouts = root.visits - self.reused
+        for future in futures:
+            remote_depth, remote_playouts, counts = future.result()
+            depth = max(depth, remote_depth)
+            playouts += remote_playouts
+            for col, n, value in counts:
+                visits[col] += n
+                values[col] += value
+
+        move = max(visits, key=lambda col: (visits[col], values[col]))
+        elapsed = time.perf_counter() - start
+        return SearchResult(
+            move=move,
+            score=values[move] / visits[move] if visits[move] else 0.0,
+            depth=depth,
+            nodes=playouts,
+            elapsed=elapsed,
+            nps=playouts / elapsed if elapsed > 0 else 0.0,
+        )
+
+    def _config(self) -> dict:
+        return {
+            "selection": self.selection,
+            "exploration": self.exploration,
+            "prior": self.prior,
+            "rollout": self.rollout,
+            "reuse": False,
+        }
+
+    def _root(self, position: int, mask: int) -> Node:
+        root = None
+        if self.reuse and self.root is not None:
+            root = self.root.find(position, mask)
+        if root is None:
+            root = Node(position, mask)
+        root.terminal = None
+        if root.children is None:
+            root.expand(self.prior)
+        self.root = root
+        self.reused = root.visits
+        return root
+
+    def _run(self, root: Node, iterations: int | None, time_limit: float | None, start: float) -> int:
+        deadline = float("inf") if time_limit is None else start + time_limit
+        remaining = float("inf") if iterations is None else iterations
+        depth = 0
+        done = 0
+        while done < remaining:
+            # The clock is only read every few playouts
+            if not done & 15 and time.perf_counter() >= deadline:
+                break
+            depth = max(depth, self._iterate(root))
+            done += 1
+        return depth
+
+    def _iterate(self, root: Node) -> int:
+        path = [root]
+        node = root
+        while node.children is not None and node.terminal is None:
+            node = self._select(node)
+            path.append(node)
+
+        if node.terminal is not None:
+            result = node.terminal
+        else:
+            node.expand(self.prior)
+            # Result for the player who moved into ``node``
+            result = -self.rollout(node.position, node.mask, self.rng)
+
+        for node in reversed(path):
+            node.visits += 1
+            node.value += result
+            result = -result
+        return len(path) - 1
+
+    def _select(self, node: Node) -> Node:
+        children = node.children
+        if self.selection == UCT:
+            unvisited = [child for child in children if child.visits == 0]
+            if unvisited:
+                return unvisited[self.rng.integers(len(unvisited))]
+            log_n = math.log(node.visits)
+            c = self.exploration
+            return max(
+                children,
+                key=lambda child: child.value / child.visits
+                + c * math.sqrt(log_n / child.visits),
+            )
+
+        scale = self.exploration * math.sqrt(node.visits)
+        return max(
+            children,
+            key=lambda child: (child.value / child.visits if child.visits else 0.0)
+            + scale * child.prior / (1 + child.visits),
+        )
+
+
+def _search_root(
+    position: int,
+    mask: int,
+    iterations: int | None,
+    time_limit: float | None,
+    config: dict,
+    seed: int,
+) -> tuple[int, int, list[tuple[int, int, float]]]:
+    """Independent search in a worker process; root visits and values per column."""
+    engine = MCTS(iterations, time_limit, workers=1, seed=seed, **config)
+    start = time.perf_counter()
+    root = engine._root(position, mask)
+    depth = engine._run(root, iterations, time_limit, start)
+    counts = [(child.col, child.visits, child.value) for child in root.children]
+    return depth, root.visits, counts
+
+
+class MCTSPolicy(Policy):
+    """
+    Policy playing the move of an ``MCTS`` engine kept for the whole match.
+
+    The tree is reused from one move to the next and dropped by ``reset``.
+    Under time control the search uses most of the time left for the move.
+    With ``workers > 1`` the engine's process pool lives until ``close`` is
+    called or the policy is garbage collected.
+    """
+
+    def mount(self, timeout: float | None = None, **options) -> None:
+        self.timeout = timeout
+        self.engine = MCTS(**options)
+
+    def reset(self) -> None:
+        self.engine.reset()
+
+    def close(self) -> None:
+        self.engine.close()
+
+    def act(self, s: np.ndarray, time_left: float | None = None) -> int:
+        state = BitboardState(s, player_to_move(s))
+        budget = time_left if time_left is not None else self.timeout
+        time_limit = None if budget is None else 0.8 * budget
+        return self.engine.search(state, time_limit=time_limit).move
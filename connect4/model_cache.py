@@ -0,0 +1,53 @@
+# Types
+from typing import Any, Callable
+
+# Libraries
+import os
+import threading
+
+_models: dict[str, tuple[tuple[int, int], Any]] = {}
+_lock = threading.Lock()
+
+
+def load_model(path: str, loader: Callable[[str], Any]) -> Any:
+    """
+    Load a model file once per process and share it between policy instances.
+
+    The object returned is shared, callers must treat it as read-only and
+    keep their own changes elsewhere. It is loaded again when the file
+    changes on disk (modification time or size).
+
+    Parameters
+    ----------
+    path : str
+        Path of the model file.
+    loader : Callable[[str], Any]
+        Function reading the file at the given path.
+
+    Returns
+    -------
+    Any
+        The loaded model.
+
+    Raises
+    ------
+    FileNotFoundError
+        If ``path`` does not exist.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _models.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    model = loader(path)
+    with _lock:
+        _models[path] = (version, model)
+    return model
+
+
+def clear_models() -> None:
+    with _lock:
+        _models.clear()
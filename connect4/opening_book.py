@@ -0,0 +1,204 @@
+# Types
+from typing import Callable
+
+# Libraries
+import mmap
+import os
+import struct
+import sys
+import time
+import numpy as np
+
+from connect4.bitboard_state import BitboardState
+from connect4.keys import canonical_action, canonical_key, mirror_key, player_to_move
+from connect4.model_cache import load_model
+from connect4.search import AlphaBetaSearch, Evaluation, center_evaluation
+from connect4.transposition import TranspositionTable
+
+MAGIC = b"C4OB"
+VERSION = 1
+HEADER = struct.Struct("<4sIQI")  # magic, version, number of positions, plies
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.c4b")
+
+
+class OpeningBook:
+    """
+    Recommended move and value of early positions, read through ``mmap``.
+
+    Entries come from whatever search ``generate`` was given; the shipped
+    book uses a depth-limited heuristic search, so its moves are good
+    guesses rather than proven best moves.
+
+    Layout after the header: the sorted ``uint64`` canonical keys of
+    ``connect4.keys``, then one ``int8`` move and one ``float32`` value per
+    position, both in the canonical orientation and from the point of view
+    of the player to move. A lookup is a binary search on the keys.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n, self.plies = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book.")
+        if version != VERSION:
+            raise ValueError(f"{path} has opening book format {version}, expected {VERSION}.")
+
+        offset = HEADER.size
+        self.keys = np.frombuffer(self._mmap, dtype=np.uint64, count=n, offset=offset)
+        offset += 8 * n
+        self.moves = np.frombuffer(self._mmap, dtype=np.int8, count=n, offset=offset)
+        offset += n
+        self.values = np.frombuffer(self._mmap, dtype=np.float32, count=n, offset=offset)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def probe(self, key: int) -> tuple[int, float] | None:
+        """Canonical move and value stored for a canonical key, None if absent."""
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i < len(self.keys) and self.keys[i] == key:
+            return int(self.moves[i]), float(self.values[i])
+        return None
+
+    def lookup(self, board: np.ndarray, player: int | None = None) -> tuple[int, float] | None:
+        """
+        Book move for a board.
+
+        Parameters
+        ----------
+        board : np.ndarray
+            Top-down (ROWS, COLS) board.
+        player : int, optional
+            Player to move, deduced from the disc counts by default.
+
+        Returns
+        -------
+        tuple[int, float] | None
+            Column to play and its value, None when the position is not in the book.
+        """
+        if np.count_nonzero(board) >= self.plies:
+            return None
+        if player is None:
+            player = player_to_move(board)
+        key, mirrored = canonical_key(board, player)
+        entry = self.probe(key)
+        if entry is None:
+            return None
+        move, value = entry
+        return canonical_action(move, mirrored), value
+
+    @staticmethod
+    def write(
+        path: str, keys: np.ndarray, moves: np.ndarray, values: np.ndarray, plies: int
+    ) -> None:
+        """Write a book file, replacing ``path`` atomically."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        order = np.argsort(keys)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(keys), plies))
+            f.write(keys[order].tobytes())
+            f.write(np.asarray(moves, dtype=np.int8)[order].tobytes())
+            f.write(np.asarray(values, dtype=np.float32)[order].tobytes())
+        os.replace(tmp_path, path)
+
+
+def load_book(path: str = BOOK_PATH) -> OpeningBook | None:
+    """The book at ``path``, opened once per process; None if there is no book."""
+    try:
+        return load_model(path, OpeningBook)
+    except (OSError, ValueError):
+        return None
+
+
+def book_move(board: np.ndarray, path: str = BOOK_PATH) -> int | None:
+    """Book column for ``board``, None when out of book."""
+    book = load_book(path)
+    if book is None:
+        return None
+    entry = book.lookup(board)
+    return None if entry is None else entry[0]
+
+
+def book_positions(plies: int) -> dict[int, BitboardState]:
+    """Non-final positions with fewer than ``plies`` discs, one per mirror pair."""
+    positions: dict[int, BitboardState] = {}
+    frontier = [BitboardState()]
+    for _ in range(plies):
+        children = []
+        for state in frontier:
+            key = state.get_hash()
+            key = min(key, mirror_key(key))
+            if key in positions or state.is_final():
+                continue
+            positions[key] = state
+            children.extend(state.transition(c) for c in state.get_free_cols())
+        frontier = children
+    return positions
+
+
+def generate(
+    path: str = BOOK_PATH,
+    plies: int = 4,
+    max_depth: int = 8,
+    time_limit: float | None = None,
+    evaluate: Evaluation = center_evaluation,
+    search: Callable[[BitboardState], tuple[int, float]] | None = None,
+) -> int:
+    """
+    Search every position of the first ``plies`` plies and write the book.
+
+    Parameters
+    ----------
+    path : str, optional
+        Output file (default is ``BOOK_PATH``).
+    plies : int, optional
+        Positions with fewer discs than this are stored (default is 4).
+    max_depth : int, optional
+        Depth of the alpha-beta search of each position (default is 8).
+    time_limit : float, optional
+        Seconds per position, no limit by default.
+    evaluate : Evaluation, optional
+        Heuristic for the search leaves (default is ``center_evaluation``).
+    search : Callable[[BitboardState], tuple[int, float]], optional
+        Replaces the alpha-beta search, e.g. with an exact solver; returns
+        the best column and its value.
+
+    Returns
+    -------
+    int
+        Number of positions written.
+    """
+    if search is None:
+        # One transposition table for the whole book, positions share subtrees
+        searcher = AlphaBetaSearch(evaluate, TranspositionTable(20), max_depth)
+
+        def search(state: BitboardState) -> tuple[int, float]:
+            result = searcher.search(state, time_limit)
+            return result.move, result.score
+
+    positions = book_positions(plies)
+    keys = np.fromiter(positions.keys(), dtype=np.uint64, count=len(positions))
+    moves = np.zeros(len(positions), dtype=np.int8)
+    values = np.zeros(len(positions), dtype=np.float32)
+    for i, (key, state) in enumerate(positions.items()):
+        move, value = search(state)
+        mirrored = key != state.get_hash()
+        moves[i] = canonical_action(move, mirrored)
+        values[i] = value
+
+    OpeningBook.write(path, keys, moves, values, plies)
+    return len(positions)
+
+
+if __name__ == "__main__":
+    # python -m connect4.opening_book [path] [plies] [max_depth]
+    out_path = sys.argv[1] if len(sys.argv) > 1 else BOOK_PATH
+    plies = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    max_depth = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    start = time.perf_counter()
+    n = generate(out_path, plies, max_depth)
+    print(f"{out_path}: {n} positions in {time.perf_counter() - start:.1f}s")
@@ -3,6 +3,18 @@ from abc import ABC, abstractmethod
 
 
 class Policy(ABC):
+    """
+    Base class of the agents played by ``tournament.play``.
+
+    Time control is opt-in: when a match has one, a policy whose ``mount``
+    accepts a ``timeout`` keyword receives the per-move budget in seconds,
+    and one whose ``act`` accepts ``time_left`` receives the seconds
+    available for the current move (None when unlimited).
+
+    Policies that override ``reset`` are mounted once per match and only
+    reset between games; the others get a fresh, newly mounted instance for
+    every game.
+    """
 
     @abstractmethod
     def mount(self) -> None:
@@ -11,3 +23,12 @@ class Policy(ABC):
     @abstractmethod
     def act(self, s: np.ndarray) -> int:
         pass
+
+    def reset(self) -> None:
+        """Forget per-game state before a new game, keeping what ``mount`` loaded."""
+        pass
+
+
+def is_resettable(policy_cls: type) -> bool:
+    """Whether instances of ``policy_cls`` can be reused across games."""
+    return getattr(policy_cls, "reset", Policy.reset) is not Policy.reset
@@ -0,0 +1,680 @@
+# Types
+from typing import Any
+
+# Libraries
+import atexit
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import weakref
+import numpy as np
+from collections import OrderedDict
+
+from connect4.keys import canonical_action, canonical_key, mirror_key, player_to_move
+from connect4.model_cache import load_model
+
+ACTIONS = 7
+MAGIC = b"C4QT"
+VERSION = 2  # 2: canonical (mirror-symmetric) state keys
+HEADER = struct.Struct("<4sIQ")  # magic, version, number of states
+EVICTION_SAMPLE = 8  # candidates compared per eviction
+
+logger = logging.getLogger(__name__)
+
+
+class FormatVersionError(ValueError):
+    """A Q-table file written in another format version, see ``upgrade``."""
+
+    def __init__(self, path: str, version: int):
+        super().__init__(
+            f"{path} has Q-table format {version}, expected {VERSION}; "
+            "upgrade it with python -m connect4.qtable --upgrade."
+        )
+        self.path = path
+        self.version = version
+
+
+class QTableStore:
+    """
+    Read-only Q-table file opened through ``mmap``.
+
+    Layout after the header: the sorted ``uint64`` state keys, then a
+    ``float32`` array of ``ACTIONS`` Q-values per state and a ``uint32``
+    array of ``ACTIONS`` visit counts per state. Lookups are a binary search
+    on the keys and the arrays are views on the mapped pages, so opening is
+    immediate and processes reading the same file share its memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Q-table file.")
+        if version != VERSION:
+            raise FormatVersionError(path, version)
+
+        offset = HEADER.size
+        self.keys = np.frombuffer(self._mmap, dtype=np.uint64, count=n, offset=offset)
+        offset += 8 * n
+        self.q_values = np.frombuffer(
+            self._mmap, dtype=np.float32, count=n * ACTIONS, offset=offset
+        ).reshape(n, ACTIONS)
+        offset += 4 * n * ACTIONS
+        self.counts = np.frombuffer(
+            self._mmap, dtype=np.uint32, count=n * ACTIONS, offset=offset
+        ).reshape(n, ACTIONS)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def find(self, key: int) -> int:
+        """Row of ``key`` in the table, -1 if absent."""
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return -1
+
+    @staticmethod
+    def write(path: str, keys: np.ndarray, q_values: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Write a Q-table file, replacing ``path`` atomically.
+
+        Parameters
+        ----------
+        path : str
+            Destination file.
+        keys : np.ndarray
+            Unique state keys, in any order.
+        q_values : np.ndarray
+            ``(len(keys), ACTIONS)`` Q-values.
+        counts : np.ndarray
+            ``(len(keys), ACTIONS)`` visit counts.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        order = np.argsort(keys)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        replaced = False
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+                f.write(keys[order].tobytes())
+                f.write(np.asarray(q_values, dtype=np.float32)[order].tobytes())
+                f.write(np.asarray(counts, dtype=np.uint32)[order].tobytes())
+            # Readers keep their mapping of the old file, new ones see the new file
+            os.replace(tmp_path, path)
+            replaced = True
+        finally:
+            if not replaced and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def detach(self) -> None:
+        """
+        Copy the arrays into memory and close the mapping.
+
+        Windows refuses to replace a file that is still mapped, so writers
+        detach the store of a path before saving over it.
+        """
+        if self._mmap is None:
+            return
+        self.keys = self.keys.copy()
+        self.q_values = self.q_values.copy()
+        self.counts = self.counts.copy()
+        self._mmap.close()
+        self._mmap = None
+
+
+class QTable:
+    """
+    Writable Q-table: a shared ``QTableStore`` plus the entries changed here.
+
+    The store is loaded through ``load_model`` and never modified; updated
+    states are copied into an in-memory overlay that ``save`` merges back
+    into a new file.
+
+    Updates are written behind: after ``flush_every`` updates or
+    ``flush_interval`` seconds a background thread saves the table, and
+    ``flush`` writes whatever is pending. A failed background write is
+    logged and its updates stay pending for the next flush, and
+    ``flush(wait=True)`` raises the error if writing still fails. Tables
+    still alive when the process exits are flushed then.
+
+    With ``max_entries`` the table never holds more states: adding one to a
+    full table evicts the rarely visited, least recently used state among a
+    sample of the least recently used ones and of states never looked up.
+
+    Processes learning in parallel should not write the same file: workers
+    call ``defer_writes`` and send their ``deltas`` to one process that
+    ``merge``s them into its table.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        load: bool = True,
+        flush_every: int | None = 1000,
+        flush_interval: float | None = 30.0,
+        max_entries: int | None = None,
+    ):
+        self.path = path
+        self.base: QTableStore | None = None
+        if load and os.path.exists(path):
+            self.base = load_model(path, QTableStore)
+        self.overlay: dict[int, tuple[list[float], list[int]]] = {}
+
+        self.max_entries = max_entries
+        self._size = 0 if self.base is None else len(self.base)
+        self._deleted: set[int] = set()  # evicted states still in the file
+        self._recency: OrderedDict[int, None] = OrderedDict()  # oldest first
+        self._rng = np.random.default_rng()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._writer: threading.Thread | None = None
+        self._error: Exception | None = None  # of the last failed write
+        _live_tables.add(self)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.overlay or self._base_row(key) >= 0
+
+    def _base_row(self, key: int) -> int:
+        if self.base is None or key in self._deleted:
+            return -1
+        return self.base.find(key)
+
+    def _lookup(self, key: int) -> tuple[list[float], list[int]] | None:
+        entry = self.overlay.get(key)
+        if entry is None:
+            i = self._base_row(key)
+            if i >= 0:
+                entry = self.base.q_values[i].tolist(), self.base.counts[i].tolist()
+        return entry
+
+    def get(self, key: int) -> tuple[list[float], list[int]] | None:
+        """Q-values and visit counts of a state, None if it was never updated."""
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.max_entries is not None:
+            self._touch(key)
+        return entry
+
+    def get_many(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Q-values and visit counts of a batch of states, zeros for unknown ones.
+
+        Unlike ``get`` this leaves hit statistics and recency untouched.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            ``(len(keys), ACTIONS)`` Q-values and counts.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        q_values = np.zeros((len(keys), ACTIONS), dtype=np.float32)
+        counts = np.zeros((len(keys), ACTIONS), dtype=np.int64)
+        with self._lock:
+            if self.base is not None and len(self.base):
+                rows = np.searchsorted(self.base.keys, keys).clip(max=len(self.base) - 1)
+                found = self.base.keys[rows] == keys
+                if self._deleted:
+                    dropped = np.fromiter(
+                        self._deleted, dtype=np.uint64, count=len(self._deleted)
+                    )
+                    found &= ~np.isin(keys, dropped)
+                q_values[found] = self.base.q_values[rows[found]]
+                counts[found] = self.base.counts[rows[found]]
+            for i, key in enumerate(keys.tolist()):
+                entry = self.overlay.get(key)
+                if entry is not None:
+                    q_values[i] = entry[0]
+                    counts[i] = entry[1]
+        return q_values, counts
+
+    def _touch(self, key: int) -> None:
+        self._recency[key] = None
+        self._recency.move_to_end(key)
+
+    def q_value(self, key: int, action: int) -> float | None:
+        """Q-value of an action, None if it was never taken in this state."""
+        entry = self.get(key)
+        if entry is None or entry[1][action] == 0:
+            return None
+        return entry[0][action]
+
+    def update(self, key: int, action: int, q_value: float) -> None:
+        """Store a new Q-value for ``action`` and count one more visit."""
+        with self._lock:
+            entry = self._writable(key)
+            entry[0][action] = q_value
+            entry[1][action] += 1
+        self.pending += 1
+        self._maybe_flush()
+
+    def update_many(
+        self, keys: np.ndarray, actions: np.ndarray, q_values: np.ndarray
+    ) -> None:
+        """``update`` for a batch; a repeated state-action keeps its last value."""
+        with self._lock:
+            batch = zip(
+                np.asarray(keys).tolist(),
+                np.asarray(actions).tolist(),
+                np.asarray(q_values).tolist(),
+            )
+            for key, action, q_value in batch:
+                entry = self._writable(key)
+                entry[0][action] = q_value
+                entry[1][action] += 1
+        self.pending += len(keys)
+        self._maybe_flush()
+
+    def _writable(self, key: int) -> tuple[list[float], list[int]]:
+        """Overlay entry of ``key``, copied from the file or created if needed."""
+        entry = self.overlay.get(key)
+        if entry is None:
+            entry = self._lookup(key)
+            if entry is None:
+                entry = [0.0] * ACTIONS, [0] * ACTIONS
+                self._size += 1
+            self.overlay[key] = entry
+        if self.max_entries is not None:
+            self._touch(key)
+            while self._size > self.max_entries and self._evict(keep=key):
+                pass
+        return entry
+
+    def merge(self, keys: np.ndarray, q_values: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Fold in updates learned elsewhere, e.g. the ``deltas`` of a worker.
+
+        Each Q-value becomes the count-weighted average of the stored one
+        and the incoming one, and the incoming visits are added.
+
+        Parameters
+        ----------
+        keys : np.ndarray
+            State keys.
+        q_values : np.ndarray
+            ``(len(keys), ACTIONS)`` Q-values.
+        counts : np.ndarray
+            ``(len(keys), ACTIONS)`` visits behind each incoming Q-value.
+        """
+        with self._lock:
+            for key, q_row, count_row in zip(
+                keys.tolist(), q_values.tolist(), counts.tolist()
+            ):
+                entry = self._writable(key)
+                for a in range(ACTIONS):
+                    if count_row[a]:
+                        total = entry[1][a] + count_row[a]
+                        entry[0][a] += (q_row[a] - entry[0][a]) * count_row[a] / total
+                        entry[1][a] = total
+                self.pending += 1
+        self._maybe_flush()
+
+    def deltas(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        States updated since the file was loaded.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Keys, current Q-values and the visits added here, for ``merge``.
+        """
+        with self._lock:
+            keys = np.fromiter(self.overlay.keys(), dtype=np.uint64, count=len(self.overlay))
+            q_values = np.array([e[0] for e in self.overlay.values()], dtype=np.float32)
+            counts = np.array([e[1] for e in self.overlay.values()], dtype=np.int64)
+        q_values = q_values.reshape(-1, ACTIONS)
+        counts = counts.reshape(-1, ACTIONS)
+        if self.base is not None and len(self.base):
+            rows = np.searchsorted(self.base.keys, keys).clip(max=len(self.base) - 1)
+            found = self.base.keys[rows] == keys
+            counts[found] -= self.base.counts[rows[found]]
+        changed = counts.any(axis=1)
+        return keys[changed], q_values[changed], counts[changed]
+
+    def reload(self) -> None:
+        """Drop the updates kept in memory and start over from the file."""
+        with self._lock:
+            self.base = None
+            if os.path.exists(self.path):
+                self.base = load_model(self.path, QTableStore)
+            self.overlay.clear()
+            self._size = 0 if self.base is None else len(self.base)
+            self._deleted.clear()
+            self._recency.clear()
+            self.pending = 0
+
+    def _visits(self, key: int) -> int:
+        entry = self.overlay.get(key)
+        if entry is not None:
+            return sum(entry[1])
+        return int(self.base.counts[self.base.find(key)].sum())
+
+    def _evict(self, keep: int) -> bool:
+        """Drop one state other than ``keep``, False if there is none to drop."""
+        # (visits, recency rank, key): states never looked up rank coldest
+        candidates = [
+            (self._visits(key), rank, key)
+            for rank, key in enumerate(
+                itertools.islice(self._recency, EVICTION_SAMPLE), start=1
+            )
+            if key != keep
+        ]
+        if self.base is not None and len(self.base):
+            for i in self._rng.integers(0, len(self.base), EVICTION_SAMPLE):
+                key = int(self.base.keys[i])
+                if key not in self._recency and key not in self._deleted:
+                    candidates.append((int(self.base.counts[i].sum()), 0, key))
+        if not candidates:
+            return False
+
+        _, _, victim = min(candidates)
+        self.overlay.pop(victim, None)
+        self._recency.pop(victim, None)
+        if self.base is not None and self.base.find(victim) >= 0:
+            self._deleted.add(victim)
+        self._size -= 1
+        self.evictions += 1
+        return True
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _maybe_flush(self) -> None:
+        if self._error is not None and (
+            time.monotonic() - self._last_flush < (self.flush_interval or 0.0)
+        ):
+            return  # A write just failed, do not retry on every update
+        if (self.flush_every is not None and self.pending >= self.flush_every) or (
+            self.flush_interval is not None
+            and self.pending
+            and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush(wait=False)
+
+    def flush(self, wait: bool = True) -> None:
+        """
+        Save pending updates to ``path``.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Write in the calling thread and return once the file is in
+            place (default is True). Otherwise start a background write,
+            unless one is already running.
+
+        Raises
+        ------
+        Exception
+            With ``wait``, whatever made the write fail; the updates are
+            kept pending.
+        """
+        if _deferred:
+            return
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            if not wait:
+                return
+            writer.join()
+        if self.pending:
+            pending, self.pending = self.pending, 0
+            self._last_flush = time.monotonic()
+            if not wait:
+                self._writer = threading.Thread(
+                    target=self._write, args=(pending,), daemon=True
+                )
+                self._writer.start()
+                return
+            # A retry that succeeds makes earlier failures moot
+            self._error = None
+            self._write(pending)
+        if wait and self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write(self, pending: int) -> None:
+        try:
+            with self._lock:
+                arrays = self.arrays()
+                self._release(self.path)
+            QTableStore.write(self.path, *arrays)
+        except Exception as exc:
+            # Keep the updates pending so the next flush tries again
+            with self._lock:
+                self.pending += pending
+            self._error = exc
+            if threading.current_thread() is self._writer:
+                logger.exception("Could not write the Q-table %s", self.path)
+
+    def _release(self, path: str) -> None:
+        """Unmap the loaded file if ``path`` is about to replace it on Windows."""
+        if (
+            os.name == "nt"
+            and self.base is not None
+            and os.path.abspath(path) == os.path.abspath(self.base.path)
+        ):
+            self.base.detach()
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Keys, Q-values and counts of the whole table, overlay included."""
+        with self._lock:
+            return self._merged_arrays()
+
+    def _merged_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        keys = np.fromiter(self.overlay.keys(), dtype=np.uint64, count=len(self.overlay))
+        q_values = np.array([e[0] for e in self.overlay.values()], dtype=np.float32)
+        counts = np.array([e[1] for e in self.overlay.values()], dtype=np.uint32)
+        q_values = q_values.reshape(-1, ACTIONS)
+        counts = counts.reshape(-1, ACTIONS)
+        if self.base is not None:
+            dropped = np.fromiter(self._deleted, dtype=np.uint64, count=len(self._deleted))
+            keep = ~np.isin(self.base.keys, np.concatenate([keys, dropped]))
+            keys = np.concatenate([self.base.keys[keep], keys])
+            q_values = np.concatenate([self.base.q_values[keep], q_values])
+            counts = np.concatenate([self.base.counts[keep], counts])
+        return keys, q_values, counts
+
+    def save(self, path: str | None = None) -> None:
+        path = path or self.path
+        with self._lock:
+            arrays = self.arrays()
+            self._release(path)
+        QTableStore.write(path, *arrays)
+
+
+_live_tables: "weakref.WeakSet[QTable]" = weakref.WeakSet()
+_open_tables: dict[str, QTable] = {}
+_deferred = False
+
+
+def open_table(path: str, **options: Any) -> QTable:
+    """
+    Return the process-wide writable table of ``path``, opening it once.
+
+    Policy instances that learn into the same file share this table, so
+    their updates are not lost to each other's writes. ``options`` go to
+    ``QTable`` the first time only.
+    """
+    path = os.path.abspath(path)
+    table = _open_tables.get(path)
+    if table is None:
+        table = _open_tables[path] = QTable(path, **options)
+    return table
+
+
+def defer_writes() -> None:
+    """
+    Never write tables from this process.
+
+    Meant for worker processes whose updates are collected with
+    ``collect_deltas`` and merged into the files by a single writer.
+    """
+    global _deferred
+    _deferred = True
+
+
+def reload_tables() -> None:
+    """Start every open table over from its file, dropping unsaved updates."""
+    for table in _open_tables.values():
+        table.reload()
+
+
+def collect_deltas() -> dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """``deltas`` of every table opened with ``open_table``, by path."""
+    return {path: table.deltas() for path, table in _open_tables.items()}
+
+
+@atexit.register
+def flush_all() -> None:
+    """Write the pending updates of every table of the process."""
+    for table in list(_live_tables):
+        try:
+            table.flush()
+        except Exception:
+            logger.exception("Could not write the Q-table %s", table.path)
+
+
+def convert_json(json_path: str, out_path: str) -> int:
+    """
+    Convert a ``qvals.json`` table of ``HumbleButHonest`` to the binary format.
+
+    States are hex dumps of the int64 board; the player to move is deduced
+    from the disc counts. Keys are canonicalized, so a position and its
+    mirror image end up in one entry with count-weighted Q-values. States
+    without any recorded action are dropped.
+
+    Returns
+    -------
+    int
+        Number of states written.
+    """
+    with open(json_path, "r") as f:
+        table: dict[str, dict[str, Any]] = json.load(f)
+
+    # Count-weighted sums of Q-values and visit counts per canonical key
+    merged: dict[int, tuple[list[float], list[int]]] = {}
+    for state_hex, actions in table.items():
+        if not actions:
+            continue
+        board = np.frombuffer(bytes.fromhex(state_hex), dtype=np.int64).reshape(6, 7)
+        key, mirrored = canonical_key(board, player_to_move(board))
+        q_sums, counts = merged.setdefault(key, ([0.0] * ACTIONS, [0] * ACTIONS))
+        for action, entry in actions.items():
+            a = canonical_action(int(action), mirrored)
+            count = max(int(entry["count"]), 1)
+            q_sums[a] += entry["q_value"] * count
+            counts[a] += count
+
+    return _write_merged(out_path, merged)
+
+
+def upgrade(path: str) -> int:
+    """
+    Rewrite a version 1 table in place with canonical keys.
+
+    Version 1 keyed states by ``encode_board``; each key is replaced by the
+    smaller of itself and its mirror image and mirror-image states are
+    merged with count-weighted Q-values, as ``convert_json`` does.
+
+    Returns
+    -------
+    int
+        Number of states written.
+
+    Raises
+    ------
+    ValueError
+        If ``path`` is not a Q-table or has a format this function cannot upgrade.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a Q-table file.")
+    magic, version, n = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a Q-table file.")
+    if version == VERSION:
+        return n
+    if version != 1:
+        raise FormatVersionError(path, version)
+
+    offset = HEADER.size
+    keys = np.frombuffer(data, dtype=np.uint64, count=n, offset=offset)
+    offset += 8 * n
+    q_values = np.frombuffer(data, dtype=np.float32, count=n * ACTIONS, offset=offset)
+    offset += 4 * n * ACTIONS
+    counts = np.frombuffer(data, dtype=np.uint32, count=n * ACTIONS, offset=offset)
+
+    merged: dict[int, tuple[list[float], list[int]]] = {}
+    for key, q_row, count_row in zip(
+        keys.tolist(),
+        q_values.reshape(n, ACTIONS).tolist(),
+        counts.reshape(n, ACTIONS).tolist(),
+    ):
+        mirrored_key = mirror_key(key)
+        mirrored = mirrored_key < key
+        q_sums, totals = merged.setdefault(
+            min(key, mirrored_key), ([0.0] * ACTIONS, [0] * ACTIONS)
+        )
+        for action in range(ACTIONS):
+            a = canonical_action(action, mirrored)
+            q_sums[a] += q_row[action] * count_row[action]
+            totals[a] += count_row[action]
+
+    return _write_merged(path, merged)
+
+
+def _write_merged(path: str, merged: dict[int, tuple[list[float], list[int]]]) -> int:
+    """Write count-weighted Q-value sums and visit counts per key as a table."""
+    keys = np.fromiter(merged.keys(), dtype=np.uint64, count=len(merged))
+    counts = np.array([c for _, c in merged.values()], dtype=np.uint32)
+    q_sums = np.array([q for q, _ in merged.values()], dtype=np.float64)
+    q_values = np.divide(q_sums, counts, out=np.zeros_like(q_sums), where=counts > 0)
+
+    QTableStore.write(
+        path,
+        keys,
+        q_values.reshape(-1, ACTIONS),
+        counts.reshape(-1, ACTIONS),
+    )
+    return len(keys)
+
+
+if __name__ == "__main__":
+    # python -m connect4.qtable qvals.json [qvals2.json ...]
+    # python -m connect4.qtable --upgrade qvals.qtb [qvals2.qtb ...]
+    if sys.argv[1:2] == ["--upgrade"]:
+        for qtb_path in sys.argv[2:]:
+            print(f"{qtb_path}: {upgrade(qtb_path)} states")
+    else:
+        for json_path in sys.argv[1:]:
+            out_path = os.path.splitext(json_path)[0] + ".qtb"
+            print(f"{json_path} -> {out_path}: {convert_json(json_path, out_path)} states")
@@ -0,0 +1,130 @@
+# Libraries
+import math
+import threading
+from abc import ABC, abstractmethod
+
+from connect4.dtos import Standing
+
+_Q = math.log(10) / 400
+
+
+class Ratings(ABC):
+    """
+    Player ratings updated incrementally, one match at a time.
+
+    ``record`` may be called from the thread collecting results while other
+    threads read ``standings``; both take the same lock. Subclasses only
+    implement ``_update`` for the rating formula.
+    """
+
+    initial = 1500.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ratings: dict[str, float] = {}
+        self._records: dict[str, list[int]] = {}  # wins, losses, draws
+
+    def add_player(self, name: str) -> None:
+        with self._lock:
+            self._add(name)
+
+    def _add(self, name: str) -> None:
+        if name not in self._ratings:
+            self._ratings[name] = self.initial
+            self._records[name] = [0, 0, 0]
+
+    def rating(self, name: str) -> float:
+        with self._lock:
+            return self._ratings.get(name, self.initial)
+
+    def deviation(self, name: str) -> float | None:
+        return None
+
+    def record(self, a: str, b: str, a_wins: int, b_wins: int, draws: int) -> None:
+        """Apply the result of a match of ``a_wins + b_wins + draws`` games."""
+        games = a_wins + b_wins + draws
+        with self._lock:
+            self._add(a)
+            self._add(b)
+            if games:
+                self._update(a, b, a_wins + 0.5 * draws, games)
+            results = ((a, (a_wins, b_wins, draws)), (b, (b_wins, a_wins, draws)))
+            for name, result in results:
+                record = self._records[name]
+                self._records[name] = [x + y for x, y in zip(record, result)]
+
+    @abstractmethod
+    def _update(self, a: str, b: str, a_score: float, games: int) -> None:
+        pass
+
+    def standings(self) -> list[Standing]:
+        """Players sorted by rating, best first."""
+        with self._lock:
+            rows = [
+                Standing(
+                    name=name,
+                    rating=rating,
+                    deviation=self.deviation(name),
+                    wins=self._records[name][0],
+                    losses=self._records[name][1],
+                    draws=self._records[name][2],
+                )
+                for name, rating in self._ratings.items()
+            ]
+        return sorted(rows, key=lambda row: -row.rating)
+
+
+class Elo(Ratings):
+    """Elo ratings; a match moves both players by ``k`` per game of surprise."""
+
+    def __init__(self, k: float = 16.0):
+        super().__init__()
+        self.k = k
+
+    def expected(self, a: float, b: float) -> float:
+        return 1.0 / (1.0 + 10 ** ((b - a) / 400))
+
+    def _update(self, a: str, b: str, a_score: float, games: int) -> None:
+        expected = self.expected(self._ratings[a], self._ratings[b])
+        delta = self.k * (a_score - games * expected)
+        self._ratings[a] += delta
+        self._ratings[b] -= delta
+
+
+class Glicko(Ratings):
+    """
+    Glicko-1 ratings, each match being a rating period for both players.
+
+    The deviation shrinks as a player accumulates games and grows by
+    ``drift`` before every match, so ratings of players that have barely
+    played move faster.
+    """
+
+    def __init__(self, deviation: float = 350.0, drift: float = 0.0):
+        super().__init__()
+        self.max_deviation = deviation
+        self.drift = drift
+        self._deviations: dict[str, float] = {}
+
+    def deviation(self, name: str) -> float:
+        return self._deviations.get(name, self.max_deviation)
+
+    def _g(self, deviation: float) -> float:
+        return 1.0 / math.sqrt(1.0 + 3.0 * (_Q * deviation / math.pi) ** 2)
+
+    def _update(self, a: str, b: str, a_score: float, games: int) -> None:
+        ra, rb = self._ratings[a], self._ratings[b]
+        da, db = (
+            min(math.hypot(self.deviation(p), self.drift), self.max_deviation)
+            for p in (a, b)
+        )
+        for player, r, d, r_op, d_op, score in (
+            (a, ra, da, rb, db, a_score),
+            (b, rb, db, ra, da, games - a_score),
+        ):
+            g = self._g(d_op)
+            expected = 1.0 / (1.0 + 10 ** (-g * (r - r_op) / 400))
+            inv_d2 = _Q**2 * games * g**2 * expected * (1.0 - expected)
+            precision = 1.0 / d**2 + inv_d2
+            self._ratings[player] = r + _Q / precision * g * (score - games * expected)
+            self._deviations[player] = math.sqrt(1.0 / precision)
@@ -0,0 +1,165 @@
+# Libraries
+import numpy as np
+
+from connect4.qtable import ACTIONS, QTable
+
+ALL_ACTIONS = (1 << ACTIONS) - 1
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of Q-learning transitions.
+
+    Every field lives in a preallocated NumPy array: state key, action,
+    reward, next-state key, bitmask of the actions legal in the next state
+    and done flag. Once full, new transitions overwrite the oldest ones.
+    Sampling is uniform, or proportional to ``priority ** alpha`` with new
+    transitions getting the highest priority seen so far.
+    """
+
+    def __init__(self, capacity: int, seed: int | None = None):
+        self.capacity = capacity
+        self.keys = np.zeros(capacity, dtype=np.uint64)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_keys = np.zeros(capacity, dtype=np.uint64)
+        self.next_legal = np.zeros(capacity, dtype=np.uint8)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity, dtype=np.float32)
+        self.rng = np.random.default_rng(seed)
+        self.added = 0  # transitions ever added
+        self._next = 0
+        self._size = 0
+        self._max_priority = 1.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        key: int,
+        action: int,
+        reward: float,
+        next_key: int,
+        done: bool,
+        next_legal: int = ALL_ACTIONS,
+    ) -> None:
+        i = self._next
+        self.keys[i] = key
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_keys[i] = next_key
+        self.next_legal[i] = next_legal
+        self.dones[i] = done
+        self.priorities[i] = self._max_priority
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.added += 1
+
+    def add_many(
+        self,
+        keys: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_keys: np.ndarray,
+        dones: np.ndarray,
+        next_legal: np.ndarray,
+    ) -> np.ndarray:
+        """``add`` for a batch of transitions; returns the slots they were written to."""
+        n = len(keys)
+        slots = (self._next + np.arange(n)) % self.capacity
+        # With more transitions than slots only the last ones survive
+        keep = slice(max(0, n - self.capacity), n)
+        self.keys[slots[keep]] = np.asarray(keys)[keep]
+        self.actions[slots[keep]] = np.asarray(actions)[keep]
+        self.rewards[slots[keep]] = np.asarray(rewards)[keep]
+        self.next_keys[slots[keep]] = np.asarray(next_keys)[keep]
+        self.next_legal[slots[keep]] = np.asarray(next_legal)[keep]
+        self.dones[slots[keep]] = np.asarray(dones)[keep]
+        self.priorities[slots[keep]] = self._max_priority
+        self._next = (self._next + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+        self.added += n
+        return slots[keep]
+
+    def sample(self, batch_size: int) -> np.ndarray:
+        """Indices of ``batch_size`` transitions drawn uniformly with replacement."""
+        return self.rng.integers(0, self._size, batch_size)
+
+    def sample_prioritized(
+        self, batch_size: int, alpha: float = 0.6, beta: float = 0.4
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Draw transitions with probability proportional to ``priority ** alpha``.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Indices and importance-sampling weights ``(N * P(i)) ** -beta``,
+            normalized so the largest one is 1.
+        """
+        scaled = self.priorities[: self._size].astype(np.float64) ** alpha
+        probabilities = scaled / scaled.sum()
+        indices = self.rng.choice(self._size, batch_size, p=probabilities)
+        weights = (self._size * probabilities[indices]) ** -beta
+        return indices, weights / weights.max()
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray) -> None:
+        priorities = np.abs(td_errors) + 1e-3
+        self.priorities[indices] = priorities
+        self._max_priority = max(self._max_priority, float(priorities.max()))
+
+
+def td_update(
+    table: QTable,
+    buffer: ReplayBuffer,
+    indices: np.ndarray,
+    alpha: float = 0.1,
+    gamma: float = 0.95,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Apply one Q-learning step to a batch of transitions.
+
+    Q-values are read for the whole batch at once, the targets
+    ``reward + gamma * max Q(next)`` are computed with array operations and
+    the results written back together. As in ``HumbleButHonest``, actions
+    never taken count as 0 and the future value is never below 0.
+
+    Parameters
+    ----------
+    table : QTable
+        Table to update.
+    buffer : ReplayBuffer
+        Source of the transitions.
+    indices : np.ndarray
+        Transitions of the batch, from ``sample`` or ``sample_prioritized``.
+    alpha : float, optional
+        Learning rate (default is 0.1).
+    gamma : float, optional
+        Discount factor (default is 0.95).
+    weights : np.ndarray, optional
+        Importance-sampling weights scaling each step.
+
+    Returns
+    -------
+    np.ndarray
+        TD error of each transition, for ``update_priorities``.
+    """
+    keys = buffer.keys[indices]
+    actions = buffer.actions[indices].astype(np.intp)
+    rows = np.arange(len(indices))
+
+    q_values, counts = table.get_many(keys)
+    old_q = np.where(counts[rows, actions] > 0, q_values[rows, actions], 0.0)
+
+    next_q, next_counts = table.get_many(buffer.next_keys[indices])
+    legal = (buffer.next_legal[indices, None] >> np.arange(ACTIONS)) & 1
+    known = (legal == 1) & (next_counts > 0)
+    future = np.where(known, next_q, 0.0).max(axis=1, initial=0.0)
+    future[buffer.dones[indices]] = 0.0
+
+    td_errors = buffer.rewards[indices] + gamma * future - old_q
+    steps = alpha * td_errors if weights is None else alpha * weights * td_errors
+    table.update_many(keys, actions, old_q + steps)
+    return td_errors
@@ -0,0 +1,225 @@
+# Types
+from typing import Callable
+
+# Libraries
+import time
+
+from connect4.dtos import SearchResult
+from connect4.environment_state import EnvironmentState
+from connect4.transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+# Scores at or beyond this magnitude are forced wins or losses
+WIN = 1_000_000.0
+MATE = WIN - 42
+CENTER_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+Evaluation = Callable[[EnvironmentState], float]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def _to_table(score: float, ply: int) -> float:
+    """Mate score counted from the root turned into one counted from this node."""
+    if score >= MATE:
+        return score + ply
+    if score <= -MATE:
+        return score - ply
+    return score
+
+
+def _from_table(score: float, ply: int) -> float:
+    """Inverse of ``_to_table``: a stored mate score counted from the root again."""
+    if score >= MATE:
+        return score - ply
+    if score <= -MATE:
+        return score + ply
+    return score
+
+
+def center_evaluation(state: EnvironmentState) -> float:
+    """Default heuristic: discs in the three central columns, own minus rival."""
+    center = state.board[:, 2:5]
+    return float((center == state.player).sum() - (center == -state.player).sum())
+
+
+class AlphaBetaSearch:
+    """
+    Negamax search with alpha-beta pruning and iterative deepening.
+
+    Works on any state exposing ``transition``, ``get_winner``,
+    ``legal_moves`` and ``get_hash`` (``ConnectState`` and
+    ``BitboardState``). Moves are tried transposition-table move first,
+    then killer moves, then by history score with center-first ties.
+    ``evaluate`` scores non-terminal leaves from the point of view of the
+    player to move and must stay well below ``WIN`` in magnitude.
+    Forced wins score ``WIN - ply`` so shorter ones are preferred; the
+    transposition table keeps them relative to the stored position, so a
+    position reached at another ply reports the right distance.
+    """
+
+    def __init__(
+        self,
+        evaluate: Evaluation = center_evaluation,
+        table: TranspositionTable | None = None,
+        max_depth: int = 42,
+    ):
+        self.evaluate = evaluate
+        self.table = table if table is not None else TranspositionTable(18)
+        self.max_depth = max_depth
+        self.nodes = 0
+        self._deadline = float("inf")
+        self._killers: list[list[int]] = []
+        self._history = {-1: [0] * 7, 1: [0] * 7}
+
+    def search(
+        self, state: EnvironmentState, time_limit: float | None = None
+    ) -> SearchResult:
+        """
+        Search ``state`` deeper and deeper until ``max_depth`` or the deadline.
+
+        Parameters
+        ----------
+        state : EnvironmentState
+            Non-final position to search.
+        time_limit : float, optional
+            Wall-clock budget in seconds. When it runs out the best move of
+            the last completed iteration is returned.
+
+        Returns
+        -------
+        SearchResult
+            Best move, its score and search statistics.
+        """
+        start = time.perf_counter()
+        self._deadline = float("inf") if time_limit is None else start + time_limit
+        self.nodes = 0
+        self._killers = [[-1, -1] for _ in range(43)]
+
+        legal = state.legal_moves()
+        if not legal or state.get_winner() != 0:
+            raise ValueError("Cannot search a final state.")
+
+        empty = 42 - sum(state.get_heights())
+        best_move = next(c for c in CENTER_ORDER if legal >> c & 1)
+        best_score = 0.0
+        depth_reached = 0
+
+        for depth in range(1, min(self.max_depth, empty) + 1):
+            try:
+                best_score, best_move = self._root(state, depth, best_move)
+            except SearchTimeout:
+                break
+            depth_reached = depth
+            if abs(best_score) >= MATE:
+                break
+
+        elapsed = time.perf_counter() - start
+        return SearchResult(
+            move=best_move,
+            score=best_score,
+            depth=depth_reached,
+            nodes=self.nodes,
+            elapsed=elapsed,
+            nps=self.nodes / elapsed if elapsed > 0 else 0.0,
+        )
+
+    def _root(
+        self, state: EnvironmentState, depth: int, first: int
+    ) -> tuple[float, int]:
+        alpha = -float("inf")
+        best_move = first
+        for col in self._ordered(state.legal_moves(), first, 0, state.player):
+            child = state.transition(col)
+            score = -self._negamax(child, depth - 1, -float("inf"), -alpha, 1)
+            if score > alpha:
+                alpha, best_move = score, col
+        self.table.store(state.get_hash(), depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(
+        self, state: EnvironmentState, depth: int, alpha: float, beta: float, ply: int
+    ) -> float:
+        self.nodes += 1
+        if time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+        winner = state.get_winner()
+        if winner != 0:
+            return WIN - ply if winner == state.player else ply - WIN
+        legal = state.legal_moves()
+        if not legal:
+            return 0.0
+        if depth == 0:
+            return self.evaluate(state)
+
+        key = state.get_hash()
+        tt_move = -1
+        entry = self.table.probe(key)
+        if entry is not None:
+            value, entry_depth, flag, tt_move = entry
+            value = _from_table(value, ply)
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        alpha_orig = alpha
+        best_score = -float("inf")
+        best_move = -1
+        for col in self._ordered(legal, tt_move, ply, state.player):
+            child = state.transition(col)
+            score = -self._negamax(child, depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_move = score, col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._record_cutoff(col, ply, depth, state.player)
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, _to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def _ordered(self, legal: int, first: int, ply: int, player: int) -> list[int]:
+        killers = self._killers[ply]
+        history = self._history[player]
+        rest = sorted(
+            (
+                c
+                for c in CENTER_ORDER
+                if legal >> c & 1 and c != first and c not in killers
+            ),
+            key=lambda c: -history[c],
+        )
+        front = [c for c in (first, *killers) if c >= 0 and legal >> c & 1]
+        return list(dict.fromkeys(front)) + rest
+
+    def _record_cutoff(self, col: int, ply: int, depth: int, player: int) -> None:
+        killers = self._killers[ply]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self._history[player][col] += depth * depth
+
+
+def best_move(
+    state: EnvironmentState,
+    evaluate: Evaluation = center_evaluation,
+    time_limit: float | None = None,
+    max_depth: int = 42,
+) -> SearchResult:
+    """Convenience wrapper running a fresh ``AlphaBetaSearch`` on ``state``."""
+    return AlphaBetaSearch(evaluate, max_depth=max_depth).search(state, time_limit)
@@ -0,0 +1,334 @@
+# Libraries
+import sys
+import time
+import numpy as np
+
+from connect4.bitboard_state import BOTTOM, COLS, FULL, H1, ROWS, BitboardState
+from connect4.dtos import SearchResult
+from connect4.environment_state import EnvironmentState
+from connect4.keys import player_to_move
+from connect4.search import CENTER_ORDER, SearchTimeout
+from connect4.transposition import LOWER, UPPER, TranspositionTable
+
+CELLS = ROWS * COLS
+# Default budget of solve_move: positions with at most this many empty
+# cells are handed to the solver by the policies, within these caps
+ENDGAME_CELLS = 18
+ENDGAME_NODES = 200_000
+ENDGAME_TIME = 1.0
+MAX_GAVE_UP = 100_000  # positions remembered as too hard
+COL_BITS = tuple(((1 << ROWS) - 1) << (c * H1) for c in range(COLS))
+
+
+def max_score(moves: int) -> int:
+    """Score of winning with the next disc after ``moves`` discs were played."""
+    return (CELLS + 1 - moves) // 2
+
+
+def winning_cells(position: int, mask: int) -> int:
+    """Empty cells that would give ``position`` four in a row."""
+    # Vertical
+    r = (position << 1) & (position << 2) & (position << 3)
+
+    # Horizontal and both diagonals
+    for shift in (H1, H1 - 1, H1 + 1):
+        p = (position << shift) & (position << 2 * shift)
+        r |= p & (position << 3 * shift)
+        r |= p & (position >> shift)
+        p = (position >> shift) & (position >> 2 * shift)
+        r |= p & (position << shift)
+        r |= p & (position >> 3 * shift)
+
+    return r & (FULL ^ mask)
+
+
+def _playable(mask: int) -> int:
+    """Cell where the next disc of each free column would land."""
+    return (mask + BOTTOM) & FULL
+
+
+def _non_losing(position: int, mask: int) -> int:
+    """Playable cells that neither leave a rival win open nor play under one."""
+    playable = _playable(mask)
+    rival_wins = winning_cells(position ^ mask, mask)
+    forced = playable & rival_wins
+    if forced:
+        if forced & (forced - 1):
+            return 0  # two threats at once, every move loses
+        playable = forced
+    return playable & ~(rival_wins >> 1)
+
+
+class Solver:
+    """
+    Exact Connect Four solver: negamax on bitboards with a null window.
+
+    Scores follow the usual convention: 0 is a draw, a positive score is a
+    win for the player to move, ``max_score`` for winning with the next
+    disc and one less for every two further discs it takes; a negative
+    score is the symmetric loss. The value of a position is found by a
+    sequence of null-window searches that bisect the score range, all of
+    them sharing one ``TranspositionTable`` of lower and upper bounds.
+    Moves that hand the rival an immediate win are never searched, and the
+    rest are tried by the number of threats they create, center first on
+    ties.
+
+    ``max_nodes`` and ``time_limit`` cap each ``solve`` call; when one is
+    exceeded ``solve`` returns None instead of a guess.
+    """
+
+    def __init__(
+        self,
+        table: TranspositionTable | None = None,
+        max_nodes: int | None = None,
+        time_limit: float | None = None,
+    ):
+        self.table = table if table is not None else TranspositionTable(20)
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.nodes = 0
+        self._node_limit = float("inf")
+        self._deadline = float("inf")
+
+    def solve(
+        self,
+        state: EnvironmentState,
+        max_nodes: int | None = None,
+        time_limit: float | None = None,
+    ) -> SearchResult | None:
+        """
+        Game-theoretic value and best move of a position.
+
+        Parameters
+        ----------
+        state : EnvironmentState
+            Non-final ``ConnectState`` or ``BitboardState``.
+        max_nodes : int, optional
+            Positions visited before giving up, the solver's by default.
+        time_limit : float, optional
+            Seconds before giving up, the solver's by default.
+
+        Returns
+        -------
+        SearchResult | None
+            Best column and its exact score, ``depth`` being the number of
+            empty cells solved; None when the budget ran out first.
+        """
+        if not isinstance(state, BitboardState):
+            state = BitboardState(state.board, state.player)
+        if state.is_final():
+            raise ValueError("Cannot solve a final state.")
+
+        max_nodes = self.max_nodes if max_nodes is None else max_nodes
+        time_limit = self.time_limit if time_limit is None else time_limit
+        start = time.perf_counter()
+        self.nodes = 0
+        self._node_limit = float("inf") if max_nodes is None else max_nodes
+        self._deadline = float("inf") if time_limit is None else start + time_limit
+
+        try:
+            move, score = self._root(state.position, state.mask)
+        except SearchTimeout:
+            return None
+
+        elapsed = time.perf_counter() - start
+        return SearchResult(
+            move=move,
+            score=score,
+            depth=CELLS - state.mask.bit_count(),
+            nodes=self.nodes,
+            elapsed=elapsed,
+            nps=self.nodes / elapsed if elapsed > 0 else 0.0,
+        )
+
+    def _root(self, position: int, mask: int) -> tuple[int, int]:
+        moves = mask.bit_count()
+        playable = _playable(mask)
+        wins = playable & winning_cells(position, mask)
+        if wins:
+            return self._column(wins & -wins), max_score(moves)
+
+        candidates = _non_losing(position, mask)
+        lost = not candidates
+        if lost:
+            # Lost whatever happens, delay the rival's four as long as possible
+            candidates = playable
+
+        best_move, best_score = -1, -CELLS
+        for col in self._ordered(position, mask, candidates):
+            move = candidates & COL_BITS[col]
+            child_position, child_mask = position ^ mask, mask | move
+            if best_move >= 0 and not lost:
+                # Cheap test first: only solve exactly moves that beat the best one
+                if -self._negamax(child_position, child_mask, -best_score - 1, -best_score) <= best_score:
+                    continue
+            best_move, best_score = col, -self._value(child_position, child_mask)
+        return best_move, best_score
+
+    def _value(self, position: int, mask: int) -> int:
+        """Exact score by bisecting the score range with null-window searches."""
+        moves = mask.bit_count()
+        if moves == CELLS:
+            return 0
+        if _playable(mask) & winning_cells(position, mask):
+            return max_score(moves)
+
+        low = -((CELLS - moves) // 2)
+        high = max_score(moves)
+        while low < high:
+            mid = low + (high - low) // 2
+            # Probe near 0 first, draws and short wins are the common answers
+            if mid <= 0 and int(low / 2) < mid:
+                mid = int(low / 2)
+            elif mid >= 0 and high // 2 > mid:
+                mid = high // 2
+            score = self._negamax(position, mask, mid, mid + 1)
+            if score <= mid:
+                high = score
+            else:
+                low = score
+        return low
+
+    def _negamax(self, position: int, mask: int, alpha: int, beta: int) -> int:
+        """Score within ``[alpha, beta]`` of a position where the side to move cannot win at once."""
+        self.nodes += 1
+        if self.nodes >= self._node_limit or (
+            not self.nodes & 1023 and time.perf_counter() >= self._deadline
+        ):
+            raise SearchTimeout()
+
+        moves = mask.bit_count()
+        candidates = _non_losing(position, mask)
+        if not candidates:
+            return -((CELLS - moves) // 2)
+        if moves >= CELLS - 2:
+            return 0
+
+        # The rival cannot win with its next disc and we cannot win with ours
+        low = -((CELLS - 2 - moves) // 2)
+        high = (CELLS - 1 - moves) // 2
+        key = position + mask
+        entry = self.table.probe(key)
+        if entry is not None:
+            value, _, flag, _ = entry
+            if flag == LOWER:
+                low = max(low, int(value))
+            elif flag == UPPER:
+                high = min(high, int(value))
+        if low >= beta:
+            return low
+        if high <= alpha:
+            return high
+        alpha = max(alpha, low)
+        beta = min(beta, high)
+
+        for col in self._ordered(position, mask, candidates):
+            move = candidates & COL_BITS[col]
+            score = -self._negamax(position ^ mask, mask | move, -beta, -alpha)
+            if score >= beta:
+                self.table.store(key, 0, score, LOWER, col)
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.table.store(key, 0, alpha, UPPER)
+        return alpha
+
+    @staticmethod
+    def _ordered(position: int, mask: int, candidates: int) -> list[int]:
+        """Columns of ``candidates``, most threats created first, center first on ties."""
+        scored = []
+        for col in CENTER_ORDER:
+            move = candidates & COL_BITS[col]
+            if move:
+                threats = winning_cells(position | move, mask).bit_count()
+                scored.append((-threats, len(scored), col))
+        scored.sort()
+        return [col for _, _, col in scored]
+
+    @staticmethod
+    def _column(move: int) -> int:
+        return (move.bit_length() - 1) // H1
+
+
+_solver: Solver | None = None
+_budget = {"max_empty": ENDGAME_CELLS, "max_nodes": ENDGAME_NODES, "time_limit": ENDGAME_TIME}
+# Position key -> node budget the solver ran out of on it
+_gave_up: dict[int, float] = {}
+
+
+def endgame_budget(
+    max_empty: int | None = None,
+    max_nodes: int | None = None,
+    time_limit: float | None = None,
+) -> None:
+    """
+    Change the default budget of ``solve_move`` in this process.
+
+    Meant for self-play and training, where a full-size search on every
+    late move costs more than it teaches: e.g. ``endgame_budget(12, 5_000)``
+    only solves small endgames and gives up quickly. Arguments left as None
+    keep their current value.
+    """
+    for name, value in (
+        ("max_empty", max_empty),
+        ("max_nodes", max_nodes),
+        ("time_limit", time_limit),
+    ):
+        if value is not None:
+            _budget[name] = value
+
+
+def solve_move(
+    board: np.ndarray,
+    player: int | None = None,
+    max_empty: int | None = None,
+    max_nodes: int | None = None,
+    time_limit: float | None = None,
+) -> int | None:
+    """
+    Exact best column of a late-game board, None when it could not be solved.
+
+    Boards with more than ``max_empty`` empty cells are not searched.
+    Budgets left as None come from ``endgame_budget``. A single solver per
+    process is reused, so its transposition table carries over between
+    moves, and positions it gave up on are not searched again with the
+    same or a smaller node budget.
+    """
+    global _solver
+    max_empty = _budget["max_empty"] if max_empty is None else max_empty
+    max_nodes = _budget["max_nodes"] if max_nodes is None else max_nodes
+    time_limit = _budget["time_limit"] if time_limit is None else time_limit
+
+    board = np.asarray(board)
+    if np.count_nonzero(board == 0) > max_empty:
+        return None
+    if player is None:
+        player = player_to_move(board)
+    state = BitboardState(board, player)
+    if state.is_final():
+        return None
+
+    key = state.get_hash()
+    nodes = float("inf") if max_nodes is None else max_nodes
+    if _gave_up.get(key, -1) >= nodes:
+        return None
+
+    if _solver is None:
+        _solver = Solver()
+    result = _solver.solve(state, max_nodes, time_limit)
+    if result is None:
+        if len(_gave_up) >= MAX_GAVE_UP:
+            _gave_up.clear()
+        _gave_up[key] = nodes
+        return None
+    return result.move
+
+
+if __name__ == "__main__":
+    # python -m connect4.solver <moves> ; columns played from the empty board, e.g. 4455443
+    state = BitboardState()
+    for digit in sys.argv[1] if len(sys.argv) > 1 else "":
+        state = state.transition(int(digit))
+    result = Solver().solve(state)
+    print(f"move {result.move}  score {result.score:+.0f}  nodes {result.nodes}  {result.elapsed:.2f}s")
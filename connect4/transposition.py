@@ -0,0 +1,93 @@
+# Libraries
+from array import array
+
+# Bound stored with each value
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+_EMPTY = -1
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of position results keyed by 64-bit hashes.
+
+    Entries live in flat typed arrays, two slots per bucket: the first slot
+    is depth-preferred (only overwritten by an equal or deeper result) and
+    the second one is always replaced. Keys come from
+    ``ConnectState.get_hash`` or ``BitboardState.get_hash``. Search code
+    stores bounds and best moves; learning code can use ``depth=0`` and the
+    ``EXACT`` flag to cache plain values.
+    """
+
+    def __init__(self, size_bits: int = 20):
+        self.size = 1 << size_bits  # buckets
+        self._mask = self.size - 1
+        slots = 2 * self.size
+        self.keys = array("Q", bytes(8 * slots))
+        self.values = array("d", bytes(8 * slots))
+        self.depths = array("b", [_EMPTY]) * slots
+        self.flags = array("b", bytes(slots))
+        self.moves = array("b", bytes(slots))
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key: int) -> tuple[float, int, int, int] | None:
+        """
+        Look up a position.
+
+        Parameters
+        ----------
+        key : int
+            64-bit position hash.
+
+        Returns
+        -------
+        tuple[float, int, int, int] | None
+            ``(value, depth, flag, move)`` if the position is stored, None otherwise.
+        """
+        slot = (key & self._mask) << 1
+        for i in (slot, slot + 1):
+            if self.keys[i] == key and self.depths[i] != _EMPTY:
+                self.hits += 1
+                return self.values[i], self.depths[i], self.flags[i], self.moves[i]
+        self.misses += 1
+        return None
+
+    def store(
+        self, key: int, depth: int, value: float, flag: int = EXACT, move: int = -1
+    ) -> None:
+        """
+        Save a result, keeping the deepest one in the depth-preferred slot.
+
+        Parameters
+        ----------
+        key : int
+            64-bit position hash.
+        depth : int
+            Remaining search depth the value was computed with.
+        value : float
+            Score from the point of view of the player to move.
+        flag : int, optional
+            ``EXACT``, ``LOWER`` or ``UPPER`` bound (default is ``EXACT``).
+        move : int, optional
+            Best column found, -1 if unknown (default is -1).
+        """
+        i = (key & self._mask) << 1
+        if not (self.keys[i] == key or depth >= self.depths[i]):
+            i += 1
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.values[i] = value
+        self.flags[i] = flag
+        self.moves[i] = move
+
+    def clear(self) -> None:
+        self.depths = array("b", [_EMPTY]) * len(self.depths)
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
@@ -2,7 +2,7 @@ import sys
 import pathlib
 import inspect
 import importlib
-from typing import Type
+from typing import Callable, Type
 
 
 def find_importable_classes(folder_route: str, base_class: Type) -> dict[str, Type]:
@@ -19,9 +19,25 @@ def find_importable_classes(folder_route: str, base_class: Type) -> dict[str, Ty
         try:
             module = importlib.import_module(module_name)
             for _, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, base_class) and obj is not base_class:
+                # Classes imported from elsewhere belong to their own module
+                if (
+                    issubclass(obj, base_class)
+                    and obj is not base_class
+                    and obj.__module__ == module_name
+                ):
                     candidates[obj.__module__.split(".")[1]] = obj
         except Exception as _:
             continue
 
     return candidates
+
+
+def accepts_keyword(function: Callable, name: str) -> bool:
+    """Whether ``function`` can be called with the keyword argument ``name``."""
+    try:
+        parameters = inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in parameters or any(
+        p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()
+    )
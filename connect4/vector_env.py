@@ -0,0 +1,111 @@
+# Libraries
+import numpy as np
+
+from connect4.features import COLS, LINES, ROWS
+
+
+class VectorConnectEnv:
+    """
+    Batch of ``num_envs`` independent Connect Four games stepped together.
+
+    Boards use the same top-down layout and values as ``ConnectState``
+    (-1 = Red, 1 = Yellow, 0 = empty) and are stored as one
+    ``(num_envs, ROWS, COLS)`` array. Finished games are reset automatically
+    by ``step``, so the batch can be driven for as many games as needed.
+    """
+
+    ROWS = ROWS
+    COLS = COLS
+
+    def __init__(self, num_envs: int):
+        self.num_envs = num_envs
+        self.boards = np.zeros((num_envs, ROWS, COLS), dtype=int)
+        self.players = np.full(num_envs, -1, dtype=int)
+        self.heights = np.zeros((num_envs, COLS), dtype=int)
+        self.moves = np.zeros(num_envs, dtype=int)
+        self._index = np.arange(num_envs)
+
+    def reset(self, envs: np.ndarray | None = None) -> np.ndarray:
+        """
+        Reset all games, or only those selected by ``envs``.
+
+        Parameters
+        ----------
+        envs : np.ndarray, optional
+            Boolean mask or integer indices of the games to reset.
+
+        Returns
+        -------
+        np.ndarray
+            The boards of the batch after the reset.
+        """
+        if envs is None:
+            envs = slice(None)
+        self.boards[envs] = 0
+        self.players[envs] = -1
+        self.heights[envs] = 0
+        self.moves[envs] = 0
+        return self.boards
+
+    def legal_mask(self) -> np.ndarray:
+        """Boolean ``(num_envs, COLS)`` array of the free columns of each game."""
+        return self.heights < ROWS
+
+    def sample_actions(self, rng: np.random.Generator) -> np.ndarray:
+        """Draw one uniformly random legal column per game."""
+        legal = self.legal_mask()
+        scores = rng.random(legal.shape)
+        scores[~legal] = -1.0
+        return scores.argmax(axis=1)
+
+    def step(
+        self, actions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Drop one disc in every game for its active player.
+
+        Parameters
+        ----------
+        actions : np.ndarray
+            One column per game.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            ``(boards, winners, dones)``: the boards after the move (finished
+            games already reset), the winner of each game that just ended
+            (-1, 1, or 0 for a draw or an ongoing game) and a boolean mask of
+            the games that ended on this step.
+
+        Raises
+        ------
+        ValueError
+            If any action targets a full or nonexistent column.
+        """
+        actions = np.asarray(actions, dtype=int)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(
+                f"Expected {self.num_envs} actions, got shape {actions.shape}."
+            )
+        invalid = (actions < 0) | (actions >= COLS)
+        invalid[~invalid] = self.heights[~invalid, actions[~invalid]] >= ROWS
+        if invalid.any():
+            raise ValueError(
+                f"Move not allowed in games {np.flatnonzero(invalid).tolist()}."
+            )
+
+        rows = ROWS - 1 - self.heights[self._index, actions]
+        self.boards[self._index, rows, actions] = self.players
+        self.heights[self._index, actions] += 1
+        self.moves += 1
+
+        # A game can only be won by the player who just moved
+        line_sums = self.boards.reshape(self.num_envs, -1)[:, LINES].sum(axis=2)
+        won = (line_sums == 4 * self.players[:, None]).any(axis=1)
+        dones = won | (self.moves == ROWS * COLS)
+        winners = np.where(won, self.players, 0)
+
+        self.players = -self.players
+        if dones.any():
+            self.reset(dones)
+        return self.boards, winners, dones
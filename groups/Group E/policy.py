@@ -1,6 +1,9 @@
 import numpy as np
 from connect4.policy import Policy
 from connect4.connect_state import ConnectState
+from connect4.features import extract, neighbor_counts
+from connect4.opening_book import book_move
+from connect4.solver import solve_move
 
 
 class YoConfio(Policy): # Disabled
@@ -14,55 +17,6 @@ class YoConfio(Policy): # Disabled
                 return r, col
         return None, None
 
-    def contar_adyacentes(self, board: np.ndarray, row: int, col: int, player: int) -> int:
-        ady = [
-            (row, col-1), (row, col+1),
-            (row+1, col), (row-1, col),
-            (row-1, col-1), (row+1, col+1),
-            (row-1, col+1), (row+1, col-1),
-        ]
-
-        puntos = 0
-        for (r, c) in ady:
-            if 0 <= r < 6 and 0 <= c < 7 and board[r, c] == player:
-                puntos += 1
-        return puntos
-
-    def contar_tres_abiertos(self, board: np.ndarray, player: int) -> int:
-        cont = 0
-
-        for r in range(6):
-            for c in range(4):
-                ventana = board[r, c:c+4]
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-
-        for r in range(3):
-            for c in range(7):
-                ventana = board[r:r+4, c]
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-
-        for r in range(3):
-            for c in range(4):
-                ventana = np.array([board[r+i, c+i] for i in range(4)])
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-
-        for r in range(3, 6):
-            for c in range(4):
-                ventana = np.array([board[r-i, c+i] for i in range(4)])
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-
-        return cont
-
-    def safe_transition(self, state, col):
-        try:
-            return state.transition(col)
-        except:
-            return None
-
     def act(self, s: np.ndarray) -> int:
         state = ConnectState(s)
 
@@ -74,6 +28,16 @@ class YoConfio(Policy): # Disabled
         if not cols_disponibles:
             return 0
 
+        # Primeras jugadas del libro de aperturas
+        apertura = book_move(s)
+        if apertura is not None:
+            return apertura
+
+        # Final de partida: con pocas casillas libres se resuelve de forma exacta
+        final = solve_move(s)
+        if final is not None:
+            return final
+
         if np.all(s == 0):
             return 3
 
@@ -89,55 +53,35 @@ class YoConfio(Policy): # Disabled
 
         scores = {c: 0 for c in cols_disponibles}
 
+        # Hijos, victorias inmediatas y respuestas ganadoras del rival en una pasada
+        analisis = state.analyze_moves()
+        hijos = analisis.children
+
         for col in cols_disponibles:
-            new_state = self.safe_transition(state, col)
-            if new_state and new_state.get_winner() == player:
+            if hijos[col].get_winner() == player:
                 scores[col] += prioridades["ganar"]
 
-        for col in cols_disponibles:
-            new_state = self.safe_transition(state, col)
-            if new_state and new_state.get_winner() == opponent:
+            if hijos[col].get_winner() == opponent:
                 scores[col] += prioridades["bloquear"]
 
-        for col in cols_disponibles:
-            sim_state = self.safe_transition(state, col)
-            if sim_state is None:
-                continue
-
-            if sim_state.is_final():
-                continue
+            # Una penalizacion por cada respuesta con la que gana el rival
+            scores[col] -= len(analisis.replies[col]) * prioridades["antimoricion"]
 
-            for col_op in range(7):
-                if not sim_state.is_applicable(col_op):
-                    continue
-
-                new_op_state = self.safe_transition(sim_state, col_op)
-                if new_op_state and new_op_state.get_winner() == opponent:
-                    scores[col] -= prioridades["antimoricion"]
-
-        for col in cols_disponibles:
-            new_state = self.safe_transition(state, col)
-            if new_state is None:
-                continue
-
-            tres_mios = self.contar_tres_abiertos(new_state.board, player)
-            tres_rival = self.contar_tres_abiertos(new_state.board, opponent)
-
-            if tres_mios > 0 and new_state.is_applicable(col):
+        # Todos los hijos se evaluan juntos
+        tableros = np.stack([hijos[col].board for col in cols_disponibles])
+        tres = extract(tableros, player).open(3)
+        vecinos = neighbor_counts(tableros, player)
+        for i, col in enumerate(cols_disponibles):
+            new_state = hijos[col]
+            if tres[i, 0] > 0 and new_state.is_applicable(col):
                 scores[col] += prioridades["tres_mios"]
 
-            if tres_rival > 0:
+            if tres[i, 1] > 0:
                 scores[col] += prioridades["tres_rival"]
 
-        for col in cols_disponibles:
-            new_state = self.safe_transition(state, col)
-            if new_state is None:
-                continue
-
             row, _ = self.get_ult_jug(new_state.board, col)
             if row is not None:
-                ady = self.contar_adyacentes(new_state.board, row, col, player)
-                scores[col] += ady * prioridades["adyacente"]
+                scores[col] += int(vecinos[i, row, col]) * prioridades["adyacente"]
 
         if 3 in cols_disponibles:
             scores[3] += prioridades["centro"]
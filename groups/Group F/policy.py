@@ -1,15 +1,44 @@
 import os
-import json
 import numpy as np
 
 from connect4.connect_state import ConnectState
+from connect4.features import HORIZONTAL, VERTICAL, extract
+from connect4.keys import canonical_action, canonical_key
+from connect4.opening_book import book_move
 from connect4.policy import Policy
+from connect4.qtable import FormatVersionError, QTable, convert_json, open_table, upgrade
+from connect4.search import AlphaBetaSearch
+from connect4.solver import solve_move
 
 POLICY_DIR = os.path.dirname(os.path.abspath(__file__))
+QTABLE_PATH = os.path.join(POLICY_DIR, "qvals.qtb")
+JSON_PATH = os.path.join(POLICY_DIR, "qvals.json")
+# Limite de estados en la tabla, se olvidan los menos visitados
+MAX_ESTADOS = 500_000
 
 
-def get_state_codificado(s: ConnectState) -> str:
-    return s.board.tobytes().hex()
+def get_state_codificado(s: ConnectState) -> tuple[int, bool]:
+    # Clave canonica: un tablero y su espejo comparten entrada
+    return canonical_key(s.board, s.player)
+
+
+def abrir_tabla() -> QTable:
+    # Conversion unica desde el formato JSON anterior
+    if not os.path.exists(QTABLE_PATH) and os.path.exists(JSON_PATH):
+        convert_json(JSON_PATH, QTABLE_PATH)
+    # Tabla compartida por todas las instancias del proceso
+    try:
+        return open_table(QTABLE_PATH, max_entries=MAX_ESTADOS)
+    except FormatVersionError:
+        # Tabla de una version anterior: se convierte en su sitio
+        upgrade(QTABLE_PATH)
+    except ValueError:
+        # Archivo ilegible: solo se reconstruye si queda el JSON, nunca se
+        # abre vacia encima de una tabla que no se pudo leer
+        if not os.path.exists(JSON_PATH):
+            raise
+        convert_json(JSON_PATH, QTABLE_PATH)
+    return open_table(QTABLE_PATH, max_entries=MAX_ESTADOS)
 
 
 def identificar_jugador(s: np.ndarray) -> int:
@@ -35,114 +64,45 @@ class HumbleButHonest(Policy):
         self.e = 0.1
         self.alpha = 0.1
         self.gamma = 0.95
-        self.q_values = {}
+        self.q_values = abrir_tabla()
         self.last_action = None
         self.last_state = None
+        # Con un ReplayBuffer las transiciones se guardan y el entrenador
+        # actualiza la tabla por lotes
+        self.replay = None
+        # Busqueda alfa-beta con la misma evaluacion para estados sin Q
+        self.busqueda = AlphaBetaSearch(self.evaluar_nodo)
 
-        json_path = os.path.join(POLICY_DIR, "qvals.json")
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, 'r') as f:
-                    self.q_values = json.load(f)
-            except:
-                pass
-
-    def safe_transition(self, state, col):
-        try:
-            return state.transition(col)
-        except:
-            return None
-
-    def contar_adyacentes(self, board: np.ndarray, row: int, col: int, player: int) -> int:
-        ady = [
-            (row, col-1), (row, col+1),
-            (row+1, col), (row-1, col),
-            (row-1, col-1), (row+1, col+1),
-            (row-1, col+1), (row+1, col-1),
-        ]
-        puntos = 0
-        for (r, c) in ady:
-            if 0 <= r < 6 and 0 <= c < 7 and board[r, c] == player:
-                puntos += 1
-        return puntos
+    def reset(self) -> None:
+        self.last_action = None
+        self.last_state = None
+        self.q_values.flush(wait=False)
 
-    def contar_tres_abiertos(self, board: np.ndarray, player: int) -> int:
-        cont = 0
-        for r in range(6):
-            for c in range(4):
-                ventana = board[r, c:c+4]
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-        for r in range(3):
-            for c in range(7):
-                ventana = board[r:r+4, c]
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-        for r in range(3):
-            for c in range(4):
-                ventana = np.array([board[r+i, c+i] for i in range(4)])
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-        for r in range(3, 6):
-            for c in range(4):
-                ventana = np.array([board[r-i, c+i] for i in range(4)])
-                if np.count_nonzero(ventana == player) == 3 and np.count_nonzero(ventana == 0) == 1:
-                    cont += 1
-        return cont
+    def evaluar_estados(self, boards: np.ndarray, players) -> np.ndarray:
+        # Varios tableros a la vez, cada uno desde el punto de vista de su jugador
+        f = extract(boards, players)
+        tres = f.open(3)
+        # Los dos abiertos solo cuentan en horizontal y vertical
+        dos = f.open(2, (HORIZONTAL, VERTICAL))
+        score = (
+            tres[..., 0] * 0.3 - tres[..., 1] * 0.4
+            + dos[..., 0] * 0.1 - dos[..., 1] * 0.15
+            + (f.center[..., 0] - f.center[..., 1]) * 0.02
+            + (f.adjacency[..., 0] - f.adjacency[..., 1]) * 0.01
+        )
+        return np.tanh(score)
 
     def evaluar_estado(self, board: np.ndarray, player: int) -> float:
-        opponent = -player
-        score = 0.0
-        
-        tres_mios = self.contar_tres_abiertos(board, player)
-        tres_rival = self.contar_tres_abiertos(board, opponent)
-        score += tres_mios * 0.3
-        score -= tres_rival * 0.4
-        
-        def contar_dos_abiertos(board, p):
-            cont = 0
-            for r in range(6):
-                for c in range(4):
-                    ventana = board[r, c:c+4]
-                    if np.count_nonzero(ventana == p) == 2 and np.count_nonzero(ventana == 0) == 2:
-                        cont += 1
-            for r in range(3):
-                for c in range(7):
-                    ventana = board[r:r+4, c]
-                    if np.count_nonzero(ventana == p) == 2 and np.count_nonzero(ventana == 0) == 2:
-                        cont += 1
-            return cont
-        
-        dos_mios = contar_dos_abiertos(board, player)
-        dos_rival = contar_dos_abiertos(board, opponent)
-        score += dos_mios * 0.1
-        score -= dos_rival * 0.15
-        
-        centro_count = 0
-        for r in range(6):
-            for c in [2, 3, 4]:
-                if board[r, c] == player:
-                    centro_count += 1
-                elif board[r, c] == opponent:
-                    centro_count -= 1
-        score += centro_count * 0.02
-        
-        conectividad = 0
-        for r in range(6):
-            for c in range(7):
-                if board[r, c] == player:
-                    conectividad += self.contar_adyacentes(board, r, c, player) * 0.01
-                elif board[r, c] == opponent:
-                    conectividad -= self.contar_adyacentes(board, r, c, opponent) * 0.01
-        score += conectividad
-        
-        return np.tanh(score)
+        return float(self.evaluar_estados(board, player))
+
+    def evaluar_nodo(self, state: ConnectState) -> float:
+        return self.evaluar_estado(state.board, state.player)
 
     def act(self, s: np.ndarray) -> int:
         if not hasattr(self, 'e'):
             self.e = 0.1
         if not hasattr(self, 'q_values'):
-            self.q_values = {}
+            self.q_values = abrir_tabla()
         if not hasattr(self, 'last_action'):
             self.last_action = None
         if not hasattr(self, 'last_state'):
@@ -151,11 +111,16 @@ class HumbleButHonest(Policy):
             self.alpha = 0.1
         if not hasattr(self, 'gamma'):
             self.gamma = 0.95
+        if not hasattr(self, 'replay'):
+            self.replay = None
+        if not hasattr(self, 'timeout'):
+            self.timeout = None
+        if not hasattr(self, 'busqueda'):
+            self.busqueda = AlphaBetaSearch(self.evaluar_nodo)
         
         player = identificar_jugador(s)
         state = ConnectState(board=s, player=player)
-        state_codificado = get_state_codificado(state)
-        opponent = -player
+        state_codificado, espejo = get_state_codificado(state)
         cols_disponibles = [c for c in range(7) if state.is_applicable(c)]
         
         if not cols_disponibles:
@@ -169,13 +134,8 @@ class HumbleButHonest(Policy):
             return 3
         
         if self.last_state is not None and self.last_action is not None:
-            last_state_cod = get_state_codificado(self.last_state)
-            last_action_str = str(self.last_action)
-            
-            if last_state_cod not in self.q_values:
-                self.q_values[last_state_cod] = {}
-            if last_action_str not in self.q_values[last_state_cod]:
-                self.q_values[last_state_cod][last_action_str] = {"q_value": 0.0, "count": 0}
+            last_state_cod, last_espejo = get_state_codificado(self.last_state)
+            last_action = canonical_action(self.last_action, last_espejo)
             
             reward = 0.0
             if state.is_final():
@@ -187,46 +147,58 @@ class HumbleButHonest(Policy):
                 else:
                     reward = 0.0
             else:
-                eval_antes = self.evaluar_estado(self.last_state.board, self.last_state.player)
-                eval_despues = self.evaluar_estado(s, -self.last_state.player)
+                eval_antes, eval_despues = self.evaluar_estados(
+                    np.stack([self.last_state.board, s]),
+                    np.array([self.last_state.player, -self.last_state.player]),
+                )
                 reward = eval_despues - eval_antes
             
-            old_q = self.q_values[last_state_cod][last_action_str]["q_value"]
-            
-            max_future_q = 0.0
-            if state_codificado in self.q_values and not state.is_final():
+            if self.replay is not None:
+                legales = 0
                 for col in cols_disponibles:
-                    col_str = str(col)
-                    if col_str in self.q_values[state_codificado]:
-                        q = self.q_values[state_codificado][col_str]["q_value"]
-                        max_future_q = max(max_future_q, q)
+                    legales |= 1 << canonical_action(col, espejo)
+                self.replay.add(
+                    last_state_cod, last_action, reward,
+                    state_codificado, state.is_final(), legales
+                )
+            else:
+                old_q = self.q_values.q_value(last_state_cod, last_action) or 0.0
             
-            new_q = old_q + self.alpha * (reward + self.gamma * max_future_q - old_q)
+                max_future_q = 0.0
+                if not state.is_final():
+                    for col in cols_disponibles:
+                        q = self.q_values.q_value(
+                            state_codificado, canonical_action(col, espejo)
+                        )
+                        if q is not None:
+                            max_future_q = max(max_future_q, q)
             
-            self.q_values[last_state_cod][last_action_str]["q_value"] = new_q
-            self.q_values[last_state_cod][last_action_str]["count"] += 1
+                new_q = old_q + self.alpha * (reward + self.gamma * max_future_q - old_q)
             
-            try:
-                json_path = os.path.join(POLICY_DIR, "qvals.json")
-                with open(json_path, "w") as f:
-                    json.dump(self.q_values, f, indent=2)
-            except:
-                pass
+                # La tabla se guarda por lotes en segundo plano, no en cada jugada
+                self.q_values.update(last_state_cod, last_action, new_q)
         
-        for col in cols_disponibles:
-            new_state = self.safe_transition(state, col)
-            if new_state and new_state.get_winner() == player:
-                self.last_action = col
-                self.last_state = state
-                return col
+        # Primeras jugadas del libro de aperturas
+        apertura = book_move(s)
+        if apertura is not None:
+            self.last_action = apertura
+            self.last_state = state
+            return apertura
+
+        # Final de partida: con pocas casillas libres se resuelve de forma exacta
+        final = solve_move(s, time_limit=self.timeout / 2 if self.timeout else None)
+        if final is not None:
+            self.last_action = final
+            self.last_state = state
+            return final
         
-        for col in cols_disponibles:
-            opponent_state = ConnectState(board=s.copy(), player=opponent)
-            opp_new_state = self.safe_transition(opponent_state, col)
-            if opp_new_state and opp_new_state.get_winner() == opponent:
-                self.last_action = col
-                self.last_state = state
-                return col
+        # Ganar si se puede, si no bloquear la victoria inmediata del rival
+        analisis = state.analyze_moves()
+        urgentes = analisis.wins + analisis.opponent_wins
+        if urgentes:
+            self.last_action = urgentes[0]
+            self.last_state = state
+            return urgentes[0]
         
         if self.e > np.random.rand():
             best_col = int(np.random.default_rng().choice(cols_disponibles))
@@ -234,14 +206,16 @@ class HumbleButHonest(Policy):
             self.last_state = state
             return best_col
         
-        if state_codificado in self.q_values:
+        entry = self.q_values.get(state_codificado)
+        if entry is not None:
             best_col = None
             best_q = float('-inf')
             
+            q_row, counts = entry
             for col in cols_disponibles:
-                col_str = str(col)
-                if col_str in self.q_values[state_codificado]:
-                    q = self.q_values[state_codificado][col_str]["q_value"]
+                a = canonical_action(col, espejo)
+                if counts[a] > 0:
+                    q = q_row[a]
                     if q > best_q:
                         best_q = q
                         best_col = col
@@ -250,6 +224,14 @@ class HumbleButHonest(Policy):
                 self.last_action = best_col
                 self.last_state = state
                 return best_col
+
+        # Estado sin Q: con tiempo por jugada se busca con la evaluacion
+        # propia; sin limite (entrenamiento) se explora al azar
+        if self.timeout:
+            best_col = self.busqueda.search(state, time_limit=self.timeout / 3).move
+            self.last_action = best_col
+            self.last_state = state
+            return best_col
         
         best_col = int(np.random.default_rng().choice(cols_disponibles))
         self.last_action = best_col
@@ -1,7 +1,27 @@
-from typing import Callable
-from connect4.dtos import Game, Match, Participant, Versus
+from collections import deque
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    as_completed,
+)
+from typing import Callable, Iterator, Literal
+from connect4.archive import EXTENSION as ARCHIVE_EXTENSION, MatchArchiveWriter
+from connect4.dtos import Game, Participant, TimeControl, Versus
 from connect4.connect_state import ConnectState
+from connect4.environment_state import EnvironmentState
+from connect4.policy import Policy, is_resettable
+from connect4.qtable import defer_writes
+from connect4.ratings import Elo, Ratings
+from connect4.utils import accepts_keyword
 import numpy as np
+import math
+import os
+import time
+
+# League matches are archived apart from the elimination bracket
+LEAGUE_DIR = "versus/league"
 
 
 def next_power_of_two(n: int) -> int:
@@ -21,24 +41,91 @@ def make_initial_matches(
     return [(players[i], players[i + 1]) for i in range(0, len(players), 2)]
 
 
+def match_seed(seed: int, round_index: int, match_index: int) -> int:
+    """Derive the seed of one match from the tournament seed and its position."""
+    sequence = np.random.SeedSequence([seed, round_index, match_index])
+    return int(sequence.generate_state(1)[0])
+
+
+def play_seeded(play: Callable, seed: int, *args, **kwargs):
+    """Call ``play`` with NumPy's global random state seeded from ``seed``.
+
+    Policies that draw from ``np.random`` (e.g. for epsilon-greedy moves)
+    then get their own stream in every match, instead of the copy of the
+    parent's state a forked pool worker starts with.
+    """
+    np.random.seed(seed)
+    return play(*args, **kwargs)
+
+
 def play_round(
     versus: Versus,
     play: Callable[[Participant, Participant, int, float, int], Participant],
     best_of: int,
     first_player_distribution: float,
     seed: int,
+    round_index: int = 0,
+    workers: int = 1,
 ) -> list[Participant]:
-    """Run a round and return the list of winners (handles BYEs)."""
-    winners: list[Participant] = []
-    for a, b in versus:
+    """Run a round and return the list of winners (handles BYEs).
+
+    Each match is played with its own seed from ``match_seed``, which also
+    seeds ``np.random`` (see ``play_seeded``), so the outcome does not
+    depend on ``workers``. With ``workers > 1`` matches run on a process
+    pool and ``play`` must be picklable (a module-level function). A
+    crashing match raises ``RuntimeError`` naming the pairing.
+    """
+    winners: list[Participant | None] = [None] * len(versus)
+    matches: dict[int, tuple[Participant, Participant]] = {}
+    for i, (a, b) in enumerate(versus):
         if a is None and b is None:
             raise ValueError("Invalid match: two BYEs")
         if a is None:  # b advances
-            winners.append(b)
+            winners[i] = b
         elif b is None:  # a advances
-            winners.append(a)
+            winners[i] = a
         else:
-            winners.append(play(a, b, best_of, first_player_distribution, seed))
+            matches[i] = (a, b)
+
+    def match_failed(i: int, exc: Exception) -> RuntimeError:
+        a, b = matches[i]
+        return RuntimeError(f"Match {a[0]} vs {b[0]} failed: {exc!r}")
+
+    if workers <= 1:
+        for i, (a, b) in matches.items():
+            i_seed = match_seed(seed, round_index, i)
+            try:
+                winners[i] = play_seeded(
+                    play, i_seed, a, b, best_of, first_player_distribution, i_seed
+                )
+            except Exception as exc:
+                raise match_failed(i, exc) from exc
+        return winners
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i, (a, b) in matches.items():
+            i_seed = match_seed(seed, round_index, i)
+            future = pool.submit(
+                play_seeded,
+                play,
+                i_seed,
+                a,
+                b,
+                best_of,
+                first_player_distribution,
+                i_seed,
+            )
+            futures[future] = i
+        # Collect results as matches finish, in whatever order that is
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                winners[i] = future.result()
+            except Exception as exc:
+                for pending in futures:
+                    pending.cancel()
+                raise match_failed(i, exc) from exc
     return winners
 
 
@@ -47,14 +134,221 @@ def pair_next_round(winners: list[Participant]) -> Versus:
     return [(winners[i], winners[i + 1]) for i in range(0, len(winners), 2)]
 
 
-def play(
+def fallback_move(state: EnvironmentState) -> int:
+    """Free column closest to the center, played for a policy out of time."""
+    return min(state.get_free_cols(), key=lambda c: abs(c - state.COLS // 2))
+
+
+def mount_agent(
+    policy_cls: type[Policy],
+    key: tuple[type[Policy], int],
+    time_control: TimeControl | None,
+    agents: dict | None,
+) -> Policy:
+    """Return a ready agent, reusing the one cached under ``key`` if it can be reset."""
+    if agents is not None and key in agents:
+        agent = agents[key]
+        agent.reset()
+        return agent
+
+    agent = policy_cls()
+    if time_control is not None and accepts_keyword(agent.mount, "timeout"):
+        agent.mount(timeout=time_control.budget(time_control.initial))
+    else:
+        agent.mount()
+    if agents is not None and is_resettable(policy_cls):
+        agents[key] = agent
+    return agent
+
+
+def play_game(
+    first_policy: type[Policy],
+    second_policy: type[Policy],
+    state_cls: type[EnvironmentState] = ConnectState,
+    time_control: TimeControl | None = None,
+    agents: dict | None = None,
+) -> tuple[Game, int, list[float], bool]:
+    """Play a single game.
+
+    Returns the history, the winner (-1, 1 or 0), the seconds left to the
+    mover after each move played (empty without ``time_control``) and
+    whether the game ended on a forfeit. Under time control each ``act``
+    runs in a helper thread so a slow policy cannot hold the game: once its
+    budget is spent it forfeits, or gets a fallback move for every turn
+    until the late call returns.
+
+    ``agents`` keeps mounted agents of resettable policies between games of
+    a match; without it every game mounts fresh instances.
+    """
+    # Two instances of the same policy in a game get distinct keys
+    keys = {
+        -1: (first_policy, 0),
+        1: (second_policy, int(first_policy is second_policy)),
+    }
+    policies = {
+        -1: mount_agent(first_policy, keys[-1], time_control, agents),
+        1: mount_agent(second_policy, keys[1], time_control, agents),
+    }
+    game_history: Game = Game()
+    clock_log: list[float] = []
+
+    state = state_cls()
+
+    if time_control is None:
+        while not state.is_final():
+            action = policies[state.player].act(state.board)
+            game_history.append(int(action))
+            state = state.transition(int(action))
+        return game_history, state.get_winner(), clock_log, False
+
+    wants_time = {
+        p: accepts_keyword(policy.act, "time_left") for p, policy in policies.items()
+    }
+    remaining = {-1: time_control.initial, 1: time_control.initial}
+    executors = {p: ThreadPoolExecutor(max_workers=1) for p in policies}
+    running: dict[int, Future | None] = {-1: None, 1: None}
+
+    try:
+        while not state.is_final():
+            player = state.player
+            budget = time_control.budget(remaining[player])
+            action = None
+            elapsed = budget
+
+            # A policy whose previous call is still running cannot be asked again
+            if running[player] is None or running[player].done():
+                kwargs = {"time_left": budget} if wants_time[player] else {}
+                start = time.perf_counter()
+                running[player] = executors[player].submit(
+                    policies[player].act, state.board, **kwargs
+                )
+                try:
+                    action = int(running[player].result(timeout=budget))
+                    running[player] = None
+                    elapsed = time.perf_counter() - start
+                except FutureTimeoutError:
+                    pass
+
+            if action is None and time_control.on_timeout == "forfeit":
+                return game_history, -player, clock_log, True
+
+            # The clock only runs, and the increment only counts, for moves played
+            if remaining[player] is not None:
+                remaining[player] = (
+                    max(remaining[player] - elapsed, 0.0) + time_control.increment
+                )
+                clock_log.append(remaining[player])
+            else:
+                clock_log.append(budget - elapsed)
+
+            if action is None:
+                action = fallback_move(state)
+
+            game_history.append(action)
+            state = state.transition(action)
+    finally:
+        for player, executor in executors.items():
+            executor.shutdown(wait=False, cancel_futures=True)
+            # An agent still busy with a late call cannot be reused
+            if running[player] is not None and agents is not None:
+                agents.pop(keys[player], None)
+
+    return game_history, state.get_winner(), clock_log, False
+
+
+# Agents mounted by a process-pool worker, kept for the games it plays next
+_worker_agents: dict = {}
+
+
+def play_pooled_game(
+    first_policy: type[Policy],
+    second_policy: type[Policy],
+    state_cls: type[EnvironmentState],
+    time_control: TimeControl | None,
+    game_seed: int,
+) -> tuple[Game, int, list[float], bool]:
+    return play_seeded(
+        play_game,
+        game_seed,
+        first_policy,
+        second_policy,
+        state_cls,
+        time_control,
+        _worker_agents,
+    )
+
+
+def speculative_games(
+    jobs: Iterator[tuple[type[Policy], type[Policy], int]],
+    state_cls: type[EnvironmentState],
+    workers: int,
+    time_control: TimeControl | None = None,
+) -> Iterator[tuple[Game, int, list[float], bool]]:
+    """Yield ``play_game`` results in order while up to ``workers`` games run ahead.
+
+    ``jobs`` gives the two policies and the seed of ``np.random`` for each
+    game, so a worker does not replay the random stream it forked with.
+    Games still queued when the caller stops iterating are cancelled; games
+    already running finish in the background and their results are
+    dropped. Workers never write Q-tables (``defer_writes``), so nothing a
+    learning policy learns in a speculative game, used or not, is saved.
+    """
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=defer_writes)
+    running: deque[Future] = deque()
+    try:
+        for first_policy, second_policy, game_seed in jobs:
+            running.append(
+                pool.submit(
+                    play_pooled_game,
+                    first_policy,
+                    second_policy,
+                    state_cls,
+                    time_control,
+                    game_seed,
+                )
+            )
+            if len(running) >= workers:
+                yield running.popleft().result()
+        while running:
+            yield running.popleft().result()
+    finally:
+        # Do not wait for games the match turned out not to need
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def play_match(
     a: Participant,
     b: Participant,
     best_of: int,
     first_player_distribution: float,
     seed: int = 911,
-) -> Participant:
-    """Play a match between two participants and return the winner."""
+    state_cls: type[EnvironmentState] = ConnectState,
+    game_workers: int = 1,
+    time_control: TimeControl | None = None,
+    archive_path: str | None = None,
+) -> tuple[int, int, int]:
+    """Play a match between two participants and return its score.
+
+    ``state_cls`` selects the game engine, e.g. ``BitboardState`` instead of
+    the default NumPy-backed ``ConnectState``. Policies only ever see
+    ``state.board``, so they are unaffected by the choice.
+
+    With ``game_workers > 1`` games are played speculatively on a process
+    pool, ahead of knowing whether the match needs them. First players and
+    the ``np.random`` seed of each game are drawn upfront from the same
+    random stream and results are applied in order with the same stopping
+    rules, so for policies that do not learn the archived match is the
+    same as in serial play. Learning policies do not learn in this mode:
+    each worker keeps its own in-memory table updates, which are discarded,
+    so their games may differ from serial play. Games running when the
+    match is decided keep their worker busy until they end.
+
+    ``time_control`` bounds the time policies may think, see ``play_game``;
+    use ``functools.partial`` to pass it through ``run_tournament``.
+
+    Games are archived to ``archive_path``, by default
+    ``versus/match_{a}_vs_{b}.jsonl``. Returns ``(a_wins, b_wins, draws)``.
+    """
     # Variables
     a_name, a_policy = a
     b_name, b_policy = b
@@ -63,75 +357,107 @@ def play(
     draws = 0
     total_games = 0
     games_to_win = (best_of // 2) + 1
+    max_draws = games_to_win + 5
+    max_games = 2 * (games_to_win - 1) + max_draws
 
-    # Random Generator
+    # Random Generator, one draw per possible game, the same values
+    # sequential ``rng.random()`` calls would produce
     rng = np.random.default_rng(seed)
+    draws_sequence = rng.random(max_games)
+    # Seeds of np.random for each game, the same in serial and speculative play
+    game_seeds = rng.integers(2**32, size=max_games)
 
-    games: list[Game] = []
+    # Decide who goes first based on the distribution
+    a_first = draws_sequence < first_player_distribution
+    jobs = (
+        (a_policy, b_policy, int(game_seed))
+        if is_a_first
+        else (b_policy, a_policy, int(game_seed))
+        for is_a_first, game_seed in zip(a_first, game_seeds)
+    )
+    if game_workers > 1:
+        results = speculative_games(jobs, state_cls, game_workers, time_control)
+    else:
+        agents: dict = {}
+        results = (
+            play_seeded(
+                play_game, game_seed, first, second, state_cls, time_control, agents
+            )
+            for first, second, game_seed in jobs
+        )
 
-    while a_wins < games_to_win and b_wins < games_to_win:
-        total_games += 1
-        # Decide who goes first based on the distribution
-        if rng.random() < first_player_distribution:
-            first_participant, second_participant = a, b
-            first_policy, second_policy = a_policy(), b_policy()
-        else:
-            first_participant, second_participant = b, a
-            first_policy, second_policy = b_policy(), a_policy()
+    # Save each game to the archive as soon as it is applied
+    if archive_path is None:
+        archive_path = f"versus/match_{a_name}_vs_{b_name}{ARCHIVE_EXTENSION}"
+    archive = MatchArchiveWriter(
+        archive_path,
+        a_name,
+        b_name,
+        best_of=best_of,
+        seed=seed,
+    )
 
-        # Mount agents
-        first_policy.mount()
-        second_policy.mount()
+    with archive:
+        for game_history, winner, clock_log, forfeit in results:
+            archive.write_game(
+                a_name if a_first[total_games] else b_name,
+                game_history.moves,
+                winner,
+                clock_log,
+                forfeit=forfeit,
+            )
 
-        state = ConnectState()
-        game_history: Game = Game()
+            # Determine winner
+            if winner != 0:
+                if (winner == -1) == a_first[total_games]:
+                    a_wins += 1
+                else:
+                    b_wins += 1
+            else:
+                draws += 1
+            total_games += 1
 
-        while not state.is_final():
-            current_policy = first_policy if state.player == -1 else second_policy
-            action = current_policy.act(state.board)
-            game_history.append((state.board.copy().tolist(), int(action)))
-            state = state.transition(int(action))
+            # Early stopping in case of too many draws
+            if a_wins >= games_to_win or b_wins >= games_to_win or draws >= max_draws:
+                break
+        results.close()
 
-        games.append(game_history)
+        # Save match result
+        archive.write_result(a_wins, b_wins, draws)
 
-        # Determine winner
-        winner = state.get_winner()
-        if winner == -1:
-            if first_participant == a:
-                a_wins += 1
-            else:
-                b_wins += 1
-        elif winner == 1:
-            if second_participant == a:
-                a_wins += 1
-            else:
-                b_wins += 1
-        else:
-            draws += 1
-
-        # Early stopping in case of too many draws
-        if draws >= games_to_win + 5:
-            break
-
-    # Save match result
-    match = Match(
-        player_a=a_name,
-        player_b=b_name,
-        player_a_wins=a_wins,
-        player_b_wins=b_wins,
-        draws=draws,
-        games=games,
-    )
+    return a_wins, b_wins, draws
 
-    # Save to file
-    match_filename = f"match_{a_name}_vs_{b_name}.json"
-    with open("versus/" + match_filename, "w") as f:
-        f.write(match.model_dump_json(indent=4))
 
+def play(
+    a: Participant,
+    b: Participant,
+    best_of: int,
+    first_player_distribution: float,
+    seed: int = 911,
+    state_cls: type[EnvironmentState] = ConnectState,
+    game_workers: int = 1,
+    time_control: TimeControl | None = None,
+) -> Participant:
+    """Play a match between two participants and return the winner.
+
+    See ``play_match`` for the options.
+    """
+    a_wins, b_wins, draws = play_match(
+        a,
+        b,
+        best_of,
+        first_player_distribution,
+        seed,
+        state_cls,
+        game_workers,
+        time_control,
+    )
     if a_wins > 0 or b_wins > 0:
         return a if a_wins > b_wins else b
-    # Decide winner at random in case of too many draws with no wins or tie
-    return a if rng.random() < 0.5 else b
+    # Decide winner at random in case of too many draws with no wins or tie,
+    # the draw that follows the first players of the games played
+    tiebreak = np.random.default_rng(seed).random(draws + 1)[draws]
+    return a if tiebreak < 0.5 else b
 
 
 def run_tournament(
@@ -141,6 +467,7 @@ def run_tournament(
     first_player_distribution: float = 0.5,
     shuffle: bool = True,
     seed: int = 911,
+    workers: int = 1,
 ):
     """
     Run a tournament among the given players using the provided play function.
@@ -159,14 +486,257 @@ def run_tournament(
         Whether to shuffle initial pairings (default is True).
     seed : int, optional
         Random seed for reproducibility (default is 911).
+    workers : int, optional
+        Processes used to play the matches of a round in parallel
+        (default is 1, play serially).
 
     """
     versus = make_initial_matches(players, shuffle=shuffle, seed=seed)
     print("Initial Matches:", versus)
+    round_index = 0
     while True:
-        winners = play_round(versus, play, best_of, first_player_distribution, seed)
+        winners = play_round(
+            versus,
+            play,
+            best_of,
+            first_player_distribution,
+            seed,
+            round_index=round_index,
+            workers=workers,
+        )
+        round_index += 1
         print("Winners this round:", winners)
         if len(winners) == 1:  # champion decided
             return winners[0]
         versus = pair_next_round(winners)
         print("Next Matches:", versus)
+
+
+def round_robin_pairings(players: list[Participant], cycles: int = 1) -> list[Versus]:
+    """Circle-method schedule where every pair meets once per cycle.
+
+    Sides are swapped on odd cycles. With an odd number of players one of
+    them rests each round.
+    """
+    entrants: list[Participant | None] = players[:]
+    if len(entrants) % 2:
+        entrants.append(None)
+    n = len(entrants)
+    rounds: list[Versus] = []
+    for cycle in range(cycles):
+        order = entrants[:]
+        for _ in range(n - 1):
+            versus: Versus = []
+            for i in range(n // 2):
+                a, b = order[i], order[n - 1 - i]
+                if a is not None and b is not None:
+                    versus.append((b, a) if cycle % 2 else (a, b))
+            rounds.append(versus)
+            # Keep the first entrant fixed and rotate the rest
+            order = [order[0], order[-1], *order[1:-1]]
+    return rounds
+
+
+def swiss_pairings(
+    players: list[Participant], ratings: Ratings, played: set[frozenset[str]]
+) -> Versus:
+    """Pair players of close rating, avoiding rematches when possible.
+
+    With an odd number of players the lowest rated one left unpaired rests.
+    """
+    pending = sorted(players, key=lambda p: -ratings.rating(p[0]))
+    versus: Versus = []
+    while len(pending) >= 2:
+        a = pending.pop(0)
+        rival = next(
+            (i for i, b in enumerate(pending) if frozenset((a[0], b[0])) not in played),
+            0,
+        )
+        versus.append((a, pending.pop(rival)))
+    return versus
+
+
+def league_directory(name: str) -> str:
+    """Create a new folder under ``LEAGUE_DIR`` for the archives of one league."""
+    directory = os.path.join(LEAGUE_DIR, name)
+    suffix = 1
+    while os.path.exists(directory):
+        suffix += 1
+        directory = os.path.join(LEAGUE_DIR, f"{name}_{suffix}")
+    os.makedirs(directory)
+    return directory
+
+
+def league_matches(
+    matches: list[tuple[int, int, Participant, Participant]],
+    play_match: Callable[..., tuple[int, int, int]],
+    best_of: int,
+    first_player_distribution: float,
+    seed: int,
+    workers: int,
+    directory: str,
+) -> Iterator[tuple[Participant, Participant, tuple[int, int, int]]]:
+    """Play ``(round, pair, a, b)`` matches, yielding scores as soon as each one ends.
+
+    Each match is seeded by its round and its pair within the round, and
+    ``np.random`` with it (see ``play_seeded``); archives go to ``directory``.
+    """
+
+    def arguments(index: int) -> tuple:
+        round_index, pair_index, a, b = matches[index]
+        m_seed = match_seed(seed, round_index, pair_index)
+        return (play_match, m_seed, a, b, best_of, first_player_distribution, m_seed)
+
+    def archive_path(index: int) -> str:
+        round_index, _, a, b = matches[index]
+        return os.path.join(
+            directory, f"r{round_index:03d}_{a[0]}_vs_{b[0]}{ARCHIVE_EXTENSION}"
+        )
+
+    def match_failed(index: int, exc: Exception) -> RuntimeError:
+        _, _, a, b = matches[index]
+        return RuntimeError(f"Match {a[0]} vs {b[0]} failed: {exc!r}")
+
+    if workers <= 1:
+        for index, (_, _, a, b) in enumerate(matches):
+            try:
+                score = play_seeded(*arguments(index), archive_path=archive_path(index))
+            except Exception as exc:
+                raise match_failed(index, exc) from exc
+            yield a, b, score
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                play_seeded, *arguments(index), archive_path=archive_path(index)
+            ): index
+            for index in range(len(matches))
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                score = future.result()
+            except Exception as exc:
+                for pending in futures:
+                    pending.cancel()
+                raise match_failed(index, exc) from exc
+            _, _, a, b = matches[index]
+            yield a, b, score
+
+
+def run_league(
+    players: list[Participant],
+    play_match: Callable[..., tuple[int, int, int]] = play_match,
+    schedule: Literal["round_robin", "swiss"] = "round_robin",
+    rounds: int | None = None,
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+    workers: int = 1,
+    ratings: Ratings | None = None,
+    name: str | None = None,
+) -> Ratings:
+    """
+    Rank players in a league instead of an elimination bracket.
+
+    Ratings are updated as each match ends, so ``ratings.standings()`` can
+    be queried from another thread while the league runs. With
+    ``workers > 1`` matches are played on a process pool in the order they
+    finish, which may change ratings slightly from run to run.
+
+    Parameters
+    ----------
+    players : List[Participant]
+        List of participants (name, policy) tuples.
+    play_match : Callable[..., tuple[int, int, int]], optional
+        Function playing a match like ``play_match``, called with
+        ``archive_path`` set to a file in the league's folder.
+    schedule : str, optional
+        "round_robin" plays every pair once per cycle; "swiss" pairs players
+        of close rating each round (default is "round_robin").
+    rounds : int, optional
+        Round-robin cycles (default 1) or Swiss rounds (default
+        ``ceil(log2(len(players)))``).
+    best_of : int, optional
+        Number of games per match (default is 7).
+    first_player_distribution : float, optional
+        Distribution of games as first player (default is 0.5).
+    seed : int, optional
+        Random seed for reproducibility (default is 911).
+    workers : int, optional
+        Processes used to play matches in parallel (default is 1, play serially).
+    ratings : Ratings, optional
+        Rating system to update, e.g. ``Glicko()`` (default is a new ``Elo()``).
+    name : str, optional
+        Folder under ``versus/league`` for this league's archives (default
+        is the schedule and the start time); a number is appended if it
+        already exists, so earlier leagues are never overwritten.
+
+    Returns
+    -------
+    Ratings
+        The updated ratings.
+    """
+    if schedule not in ("round_robin", "swiss"):
+        raise ValueError(f"Unknown league schedule: {schedule}")
+    if ratings is None:
+        ratings = Elo()
+    for player_name, _ in players:
+        ratings.add_player(player_name)
+    directory = league_directory(
+        name or f"{schedule}_{time.strftime('%Y%m%d_%H%M%S')}"
+    )
+
+    def apply(results) -> None:
+        for a, b, (a_wins, b_wins, draws) in results:
+            ratings.record(a[0], b[0], a_wins, b_wins, draws)
+            print(f"{a[0]} {a_wins}-{b_wins}-{draws} {b[0]}")
+
+    if schedule == "round_robin":
+        # Every match is known upfront, so all of them share the pool
+        matches = [
+            (round_index, pair_index, a, b)
+            for round_index, versus in enumerate(
+                round_robin_pairings(players, rounds or 1)
+            )
+            for pair_index, (a, b) in enumerate(versus)
+        ]
+        apply(
+            league_matches(
+                matches,
+                play_match,
+                best_of,
+                first_player_distribution,
+                seed,
+                workers,
+                directory,
+            )
+        )
+    else:
+        played: set[frozenset[str]] = set()
+        for round_index in range(rounds or math.ceil(math.log2(len(players)))):
+            versus = swiss_pairings(players, ratings, played)
+            played.update(frozenset((a[0], b[0])) for a, b in versus)
+            apply(
+                league_matches(
+                    [
+                        (round_index, pair_index, a, b)
+                        for pair_index, (a, b) in enumerate(versus)
+                    ],
+                    play_match,
+                    best_of,
+                    first_player_distribution,
+                    seed,
+                    workers,
+                    directory,
+                )
+            )
+
+    print("Standings:")
+    for position, row in enumerate(ratings.standings(), start=1):
+        print(
+            f"{position:>3}. {row.name:<20} {row.rating:7.1f}"
+            f"  {row.wins}-{row.losses}-{row.draws}"
+        )
+    return ratings
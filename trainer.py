@@ -1,10 +1,24 @@
 # trainer.py
 import os
+import time
 import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 from connect4.connect_state import ConnectState
-from connect4.policy import Policy
+from connect4.features import winning_moves
+from connect4.keys import canonical_keys
+from connect4.policy import Policy, is_resettable
+from connect4.qtable import (
+    collect_deltas,
+    defer_writes,
+    flush_all,
+    open_table,
+    reload_tables,
+)
+from connect4.replay import ReplayBuffer, td_update
+from connect4.solver import endgame_budget
 from connect4.utils import find_importable_classes
+from connect4.vector_env import VectorConnectEnv
 
 
 def get_humble_class():
@@ -22,36 +36,319 @@ def get_humble_class():
     raise RuntimeError("No encontré la clase HumbleButHonest en groups/")
 
 
-def jugar_partida(policy_cls):
+def nuevos_agentes(policy_cls, replay=None):
     rojo = policy_cls()
     amarillo = policy_cls()
-
     rojo.mount()
     amarillo.mount()
+    if replay is not None:
+        rojo.replay = replay
+        amarillo.replay = replay
+    return {-1: rojo, 1: amarillo}
 
-    state = ConnectState()
 
-    while not state.is_final():
-        if state.player == -1:
-            action = rojo.act(state.board)
+def preparar_agentes(policy_cls, agentes=None, replay=None):
+    """Reutiliza los agentes montados si la policy soporta ``reset``."""
+    if agentes is None or not is_resettable(policy_cls):
+        return nuevos_agentes(policy_cls, replay)
+    for agente in agentes.values():
+        agente.reset()
+    return agentes
+
+
+def repasar(
+    agente, buffer: ReplayBuffer, vistas: int, lote: int = 256, priorizado: bool = False
+) -> int:
+    """
+    Actualiza la tabla de ``agente`` con lotes de transiciones del buffer.
+
+    Hace un lote de ``lote`` transiciones por cada ``lote`` transiciones
+    nuevas desde ``vistas`` y devuelve el nuevo valor de ``vistas``.
+    """
+    while buffer.added - vistas >= lote:
+        if priorizado:
+            indices, pesos = buffer.sample_prioritized(lote)
+            errores = td_update(
+                agente.q_values, buffer, indices, agente.alpha, agente.gamma, pesos
+            )
+            buffer.update_priorities(indices, errores)
         else:
-            action = amarillo.act(state.board)
+            indices = buffer.sample(lote)
+            td_update(agente.q_values, buffer, indices, agente.alpha, agente.gamma)
+        vistas += lote
+    return vistas
+
+
+def jugar_partida(policy_cls, state_cls=ConnectState, agentes=None, replay=None):
+    agentes = preparar_agentes(policy_cls, agentes, replay)
 
+    state = state_cls()
+
+    while not state.is_final():
+        action = agentes[state.player].act(state.board)
         state = state.transition(int(action))
 
     return state.get_winner()
 
 
-def entrenar(episodios: int = 200):
+def elegir_acciones(agente, env, rng):
+    """
+    Decision de HumbleButHonest para todos los tableros de ``env`` a la vez.
+
+    Gana si puede, si no bloquea; si no, explora con probabilidad
+    ``agente.e`` o juega la accion de mayor Q-value conocida (al azar si no
+    conoce ninguna). El tablero vacio abre en el centro. El libro de
+    aperturas y el solver no se usan aqui.
+
+    Devuelve las columnas elegidas, las claves canonicas de los tableros y
+    si cada clave es la del espejo.
+    """
+    boards, players, legal = env.boards, env.players, env.legal_mask()
+    n = len(boards)
+    claves, espejo = canonical_keys(boards, players)
+
+    ganar = winning_moves(boards, players)
+    bloquear = winning_moves(boards, -players)
+    urgente = np.where(
+        ganar.any(axis=1),
+        ganar.argmax(axis=1),
+        np.where(bloquear.any(axis=1), bloquear.argmax(axis=1), -1),
+    )
+
+    azar = env.sample_actions(rng)
+
+    # Q-values en la orientacion del tablero real
+    q, visitas = agente.q_values.get_many(claves)
+    q = np.where(espejo[:, None], q[:, ::-1], q)
+    conocidas = legal & np.where(espejo[:, None], visitas[:, ::-1], visitas).astype(bool)
+    voraz = np.where(conocidas, q, -np.inf).argmax(axis=1)
+    explorar = rng.random(n) < agente.e
+
+    acciones = np.where(conocidas.any(axis=1) & ~explorar, voraz, azar)
+    acciones = np.where(urgente >= 0, urgente, acciones)
+    acciones[~boards.any(axis=(1, 2))] = 3
+    return acciones, claves, espejo
+
+
+def jugar_partidas_vectorizadas(
+    policy_cls, episodios: int, n_envs: int, replay=None, **repaso
+):
+    """
+    Juega ``episodios`` partidas repartidas en ``n_envs`` tableros simultaneos.
+
+    Un solo agente decide por todos los tableros en cada jugada con
+    operaciones de NumPy (``elegir_acciones``) y las transiciones se
+    aprenden por lotes con ``td_update``, con las mismas recompensas que
+    ``HumbleButHonest.act``. Con ``replay`` las transiciones van a ese
+    buffer y se aprende de el por lotes al terminar cada partida
+    (``repaso`` se pasa a ``repasar``); sin el se aprende de las
+    transiciones de cada jugada en cuanto se producen.
+    """
+    agente = policy_cls()
+    agente.mount()
+    rng = np.random.default_rng()
+    env = VectorConnectEnv(n_envs)
+    boards = env.reset()
+    recientes = ReplayBuffer(n_envs)  # Transiciones de la jugada actual
+
+    # Ultima jugada de cada jugador (columna 0 rojo, 1 amarillo) en cada tablero
+    prev_claves = np.zeros((n_envs, 2), dtype=np.uint64)
+    prev_acciones = np.zeros((n_envs, 2), dtype=np.int8)
+    prev_boards = np.zeros((n_envs, 2, env.ROWS, env.COLS), dtype=int)
+    prev_validas = np.zeros((n_envs, 2), dtype=bool)
+    todos = np.arange(n_envs)
+
+    vistas = 0
+    activos = np.arange(n_envs) < episodios
+    iniciadas = int(activos.sum())
+    resultados = []
+    siguiente_reporte = 200
+
+    while activos.any():
+        players = env.players.copy()
+        lado = (players == 1).astype(int)
+        legal = env.legal_mask()
+        acciones, claves, espejo = elegir_acciones(agente, env, rng)
+
+        # Recompensa de la jugada anterior de quien mueve ahora, como en act
+        pendientes = np.flatnonzero(prev_validas[todos, lado] & activos)
+        if len(pendientes):
+            lados = lado[pendientes]
+            antes, despues = agente.evaluar_estados(
+                np.concatenate([prev_boards[pendientes, lados], boards[pendientes]]),
+                np.concatenate([players[pendientes], -players[pendientes]]),
+            ).reshape(2, -1)
+            legales = np.where(espejo[:, None], legal[:, ::-1], legal)[pendientes]
+            transiciones = (
+                prev_claves[pendientes, lados],
+                prev_acciones[pendientes, lados],
+                despues - antes,
+                claves[pendientes],
+                np.zeros(len(pendientes), dtype=bool),
+                (legales << np.arange(env.COLS)).sum(axis=1),
+            )
+            if replay is not None:
+                replay.add_many(*transiciones)
+            else:
+                indices = recientes.add_many(*transiciones)
+                td_update(agente.q_values, recientes, indices, agente.alpha, agente.gamma)
+
+        prev_claves[todos, lado] = claves
+        prev_acciones[todos, lado] = np.where(espejo, env.COLS - 1 - acciones, acciones)
+        prev_boards[todos, lado] = boards
+        prev_validas[todos, lado] = True
+
+        boards, winners, dones = env.step(acciones)
+
+        # Como en jugar_partida, los agentes no llegan a ver el tablero final
+        prev_validas[dones] = False
+        for i in np.flatnonzero(dones & activos):
+            resultados.append(int(winners[i]))
+            if replay is not None:
+                vistas = repasar(agente, replay, vistas, **repaso)
+            if iniciadas < episodios:
+                iniciadas += 1
+            else:
+                activos[i] = False
+
+        if len(resultados) >= siguiente_reporte:
+            print(f"{siguiente_reporte} partidas completadas...")
+            siguiente_reporte += 200
+
+    return resultados
+
+
+# En autojuego el solver solo resuelve finales pequenos y se rinde pronto:
+# con el presupuesto de torneo se lleva la mayor parte del tiempo de act
+SOLVER_CASILLAS = 12
+SOLVER_NODOS = 5_000
+
+
+# Estado de cada proceso trabajador del entrenamiento en paralelo
+_policy_trabajador = None
+_agentes_trabajador = None
+
+
+def iniciar_trabajador():
+    # Los trabajadores aprenden en memoria, solo el proceso principal escribe
+    global _policy_trabajador
+    defer_writes()
+    endgame_budget(SOLVER_CASILLAS, SOLVER_NODOS)
+    np.random.seed()  # Cada proceso con su propia aleatoriedad
+    _policy_trabajador = get_humble_class()
+
+
+def jugar_lote(partidas: int, state_cls=ConnectState):
+    """Juega ``partidas`` desde la ultima tabla guardada y devuelve lo aprendido."""
+    global _agentes_trabajador
+    reload_tables()
+    if _agentes_trabajador is None and is_resettable(_policy_trabajador):
+        _agentes_trabajador = nuevos_agentes(_policy_trabajador)
+    resultados = [
+        jugar_partida(_policy_trabajador, state_cls, _agentes_trabajador)
+        for _ in range(partidas)
+    ]
+    return resultados, collect_deltas()
+
+
+def jugar_partidas_paralelas(episodios: int, workers: int, lote: int = 50, state_cls=ConnectState):
+    """
+    Reparte ``episodios`` en lotes de ``lote`` partidas entre ``workers`` procesos.
+
+    Cada lote empieza desde la tabla guardada y devuelve las actualizaciones
+    que hizo; el proceso principal las fusiona (promedio ponderado por
+    visitas) y guarda la tabla antes de enviar el siguiente lote.
+    """
+    resultados = []
+    restantes = episodios
+    inicio = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=iniciar_trabajador) as pool:
+
+        def enviar():
+            nonlocal restantes
+            partidas = min(lote, restantes)
+            restantes -= partidas
+            return pool.submit(jugar_lote, partidas, state_cls)
+
+        en_curso = {enviar() for _ in range(workers) if restantes > 0}
+        while en_curso:
+            listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                lote_resultados, deltas = futuro.result()
+                for path, arrays in deltas.items():
+                    tabla = open_table(path)
+                    tabla.merge(*arrays)
+                    tabla.flush()
+                resultados.extend(lote_resultados)
+                if restantes > 0:
+                    en_curso.add(enviar())
+
+            segundos = time.perf_counter() - inicio
+            print(
+                f"{len(resultados)} partidas completadas "
+                f"({len(resultados) / segundos:.1f} partidas/s)..."
+            )
+
+    return resultados
+
+
+def entrenar(
+    episodios: int = 200,
+    state_cls=ConnectState,
+    n_envs: int = 1,
+    workers: int = 1,
+    replay: int = 0,
+    lote: int = 256,
+    priorizado: bool = False,
+):
+    """
+    Entrena a HumbleButHonest jugando contra si mismo.
+
+    Con ``replay > 0`` los agentes guardan sus transiciones en un buffer de
+    esa capacidad y la tabla se actualiza por lotes de ``lote`` transiciones
+    (muestreo uniforme, o por prioridad con ``priorizado``) en lugar de una
+    vez por jugada. El buffer permite reutilizar transiciones, no jugar mas
+    rapido: las partidas por segundo son parecidas con y sin el. No se
+    combina con ``workers``.
+
+    Con ``n_envs > 1`` se juegan ``n_envs`` partidas a la vez y las
+    jugadas de todas se eligen juntas con NumPy (``elegir_acciones``), sin
+    libro de aperturas ni solver; es la forma mas rapida de entrenar.
+    """
     policy_cls = get_humble_class()
+    endgame_budget(SOLVER_CASILLAS, SOLVER_NODOS)
+    buffer = ReplayBuffer(replay) if replay > 0 else None
+    repaso = {"lote": lote, "priorizado": priorizado}
 
     wins_rojo = 0
     wins_amarillo = 0
     draws = 0
+    inicio = time.perf_counter()
 
-    for i in range(episodios):
-        resultado = jugar_partida(policy_cls)
+    if workers > 1:
+        resultados = jugar_partidas_paralelas(episodios, workers, state_cls=state_cls)
+    elif n_envs > 1:
+        resultados = jugar_partidas_vectorizadas(
+            policy_cls, episodios, n_envs, buffer, **repaso
+        )
+    elif buffer is not None:
+        agentes = nuevos_agentes(policy_cls, buffer)
 
+        def partidas_con_repaso():
+            vistas = 0
+            for _ in range(episodios):
+                yield jugar_partida(policy_cls, state_cls, agentes, buffer)
+                vistas = repasar(agentes[-1], buffer, vistas, **repaso)
+
+        resultados = partidas_con_repaso()
+    else:
+        agentes = nuevos_agentes(policy_cls) if is_resettable(policy_cls) else None
+        resultados = (
+            jugar_partida(policy_cls, state_cls, agentes) for _ in range(episodios)
+        )
+
+    for i, resultado in enumerate(resultados):
         if resultado == -1:
             wins_rojo += 1
         elif resultado == 1:
@@ -59,13 +356,18 @@ def entrenar(episodios: int = 200):
         else:
             draws += 1
 
-        if (i + 1) % 200 == 0:
+        if workers <= 1 and n_envs <= 1 and (i + 1) % 200 == 0:
             print(f"{i+1} partidas completadas...")
 
+    # Guarda lo aprendido que aun no se haya escrito a disco
+    flush_all()
+    segundos = time.perf_counter() - inicio
+
     print("\n--- RESULTADOS ENTRENAMIENTO ---")
     print("Victorias como rojo:", wins_rojo)
     print("Victorias como amarillo:", wins_amarillo)
     print("Empates:", draws)
+    print(f"Partidas por segundo: {episodios / segundos:.1f}")
     print("--------------------------------")
 
 